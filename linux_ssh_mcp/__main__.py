@@ -1,6 +1,5 @@
 from linux_ssh_mcp.config_manager import ConfigManager
 from linux_ssh_mcp.logger import setup_logger
-from linux_ssh_mcp.mcp_server import create_mcp_server
 
 
 def main() -> int:
@@ -15,7 +14,9 @@ def main() -> int:
     # 2. 设置日志
     setup_logger(config_manager.settings)
 
-    # 3. 创建 MCP 服务器
+    # 3. 创建 MCP 服务器（延迟导入：mcp/asyncssh 依赖树较重，配置与日志就绪后再加载）
+    from linux_ssh_mcp.mcp_server import create_mcp_server
+
     mcp = create_mcp_server(settings=config_manager.settings)
 
     # 4. 使用 FastMCP 标准启动方式
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Callable
 from dataclasses import dataclass
 
 import keyring
 
+# keyring 查询结果在进程内的默认缓存时间（秒）。
+# 缓存只感知本进程经 store_credentials/invalidate 做的修改；在进程外新增或轮换的凭据，
+# 要等对应缓存过期后才会读到。未找到凭据的查询不缓存，进程外新增的凭据可立即生效
+_DEFAULT_CREDENTIAL_TTL_SECONDS: float = 300.0
+
 
 @dataclass(frozen=True)
 class SSHCredentials:
@@ -24,8 +31,18 @@ class SSHCredentials:
 
 
 class AuthManager:
-    def __init__(self, *, service_name: str = "linux-ssh-mcp") -> None:
+    def __init__(
+        self,
+        *,
+        service_name: str = "linux-ssh-mcp",
+        cred_ttl_seconds: float = _DEFAULT_CREDENTIAL_TTL_SECONDS,
+        time_provider: Callable[[], float] = time.monotonic,
+    ) -> None:
         self._service_name = service_name
+        self._cred_ttl = cred_ttl_seconds
+        self._time = time_provider
+        # (host, username) 小写 -> (password, private_key_path, 读取时间)
+        self._cred_cache: dict[tuple[str, str], tuple[str | None, str | None, float]] = {}
 
     def store_credentials(
         self,
@@ -50,13 +67,18 @@ class AuthManager:
                 self._key(host, username, "private_key_path"),
                 private_key_path,
             )
+        self.invalidate(host=host, username=username)
 
     def get_credentials(self, *, host: str, username: str) -> SSHCredentials:
-        password = keyring.get_password(self._service_name, self._key(host, username, "password"))
-        private_key_path = keyring.get_password(
-            self._service_name,
-            self._key(host, username, "private_key_path"),
-        )
+        cache_key = (host.lower(), username.lower())
+        now = self._time()
+        cached = self._cred_cache.get(cache_key)
+        if cached is not None and now - cached[2] < self._cred_ttl:
+            password, private_key_path = cached[0], cached[1]
+        else:
+            password, private_key_path = self._lookup(host, username)
+            if password or private_key_path:
+                self._cred_cache[cache_key] = (password, private_key_path, now)
         return SSHCredentials(
             host=host,
             username=username,
@@ -64,6 +86,19 @@ class AuthManager:
             private_key_path=private_key_path,
         )
 
+    def invalidate(self, *, host: str, username: str) -> None:
+        self._cred_cache.pop((host.lower(), username.lower()), None)
+
+    def _lookup(self, host: str, username: str) -> tuple[str | None, str | None]:
+        password = keyring.get_password(
+            self._service_name, self._key(host, username, "password")
+        )
+        private_key_path = keyring.get_password(
+            self._service_name,
+            self._key(host, username, "private_key_path"),
+        )
+        return password, private_key_path
+
     @staticmethod
     def _key(host: str, username: str, field: str) -> str:
         return f"{host}|{username}|{field}".lower()
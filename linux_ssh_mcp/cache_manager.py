@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import asyncio
+import heapq
+import itertools
 import re
 import time
 from collections import OrderedDict
-from collections.abc import Callable, Hashable, Iterable
+from collections.abc import Callable, Hashable, Iterable, Iterator
 from dataclasses import dataclass
 from typing import Any, Literal
 
@@ -12,25 +13,48 @@ from linux_ssh_mcp.settings import SSHMCPSettings
 
 CacheCategory = Literal["static", "dynamic"]
 
+_NS_PER_SECOND: int = 1_000_000_000
 
-@dataclass
+# 无标签条目与反向索引未命中时共用的空集合，避免重复分配
+_EMPTY_FROZENSET: frozenset[Any] = frozenset()
+
+# 频率草图：每行一个乘法散列种子，计数器上限为4位
+_SKETCH_SEEDS: tuple[int, ...] = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+_SKETCH_COUNTER_MAX: int = 15
+_HASH_MASK: int = (1 << 64) - 1
+# 衰减时将所有计数器减半
+_HALVE_TABLE: bytes = bytes(i >> 1 for i in range(256))
+
+
+@dataclass(slots=True)
 class CacheEntry:
     value: Any
-    created_at_monotonic: float
-    expires_at_monotonic: float
+    created_at_ns: int
+    expires_at_ns: int
     category: CacheCategory
     tags: frozenset[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CacheInfo:
     maxsize: int
     size: int
     keys: list[str]
 
 
-_WRITE_COMMAND_RE = re.compile(
-    r"(?ix)\b("
+# 不可缓存命令：写操作命令、Shell重定向/tee、sed -i 原地修改。
+# 合并为单个正则，判定时只需一次扫描。
+_UNCACHEABLE_COMMAND_RE = re.compile(
+    r"(?i)"
+    r"[<>]"
+    r"|\|\s*tee\b"
+    r"|\bsed\b.*\s-i(?:\s|$)"
+    r"|\b(?:"
     r"rm|rmdir|mv|cp|dd|truncate|touch|chmod|chown|chgrp|"
     r"sed|perl|python|tee|"
     r"apt|apt-get|yum|dnf|pacman|systemctl|service|"
@@ -40,33 +64,83 @@ _WRITE_COMMAND_RE = re.compile(
     r")\b"
 )
 
-_SHELL_REDIRECT_RE = re.compile(r"[<>]{1,2}|\|\s*tee\b", flags=re.IGNORECASE)
-_SED_INPLACE_RE = re.compile(r"\bsed\b.*\s-i(\s|$)", flags=re.IGNORECASE)
+
+class _FrequencySketch:
+    """Count-Min 频率草图（TinyLFU 准入策略使用）。
+
+    每行 width 个4位饱和计数器，估计值取各行最小值；
+    累计增加 10*width 次后所有计数器减半，使历史热度逐渐衰减。
+    """
+
+    __slots__ = ("_additions", "_mask", "_rows", "_sample_size")
+
+    def __init__(self, width: int) -> None:
+        width = 1 << max(4, (width - 1).bit_length())
+        self._rows = [bytearray(width) for _ in _SKETCH_SEEDS]
+        self._mask = width - 1
+        self._additions = 0
+        self._sample_size = 10 * width
+
+    def _indexes(self, key: Hashable) -> list[int]:
+        h = hash(key) & _HASH_MASK
+        return [((h * seed) & _HASH_MASK) >> 32 & self._mask for seed in _SKETCH_SEEDS]
+
+    def increment(self, key: Hashable) -> None:
+        added = False
+        for row, i in zip(self._rows, self._indexes(key), strict=True):
+            if row[i] < _SKETCH_COUNTER_MAX:
+                row[i] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._reset()
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key), strict=True))
+
+    def _reset(self) -> None:
+        self._rows = [row.translate(_HALVE_TABLE) for row in self._rows]
+        self._additions //= 2
 
 
 class CacheManager:
+    """TTL+LRU 结果缓存。
+
+    缓存已满时采用 TinyLFU 准入：新键的访问频率低于LRU淘汰候选时
+    不予写入，避免一次性命令结果把热点条目挤出缓存。
+
+    所有操作运行在同一事件循环中，且各方法内部不含 await，
+    在事件循环上天然原子，因此无需加锁；保留异步接口以兼容调用方。
+    """
+
     def __init__(
         self,
         *,
         settings: SSHMCPSettings,
-        time_provider: Callable[[], float] = time.monotonic,
+        time_provider_ns: Callable[[], int] = time.monotonic_ns,
     ) -> None:
         self._settings = settings
-        self._time = time_provider
-        self._lock = asyncio.Lock()
+        self._time_ns = time_provider_ns
+        # LRU顺序直接使用 OrderedDict：move_to_end 由C实现，
+        # 实测比纯Python双向链表节点的摘链/挂链更快，过期时间等元数据已内联在 CacheEntry 中
         self._data: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        # 过期时间最小堆 (expires_at, seq, key)，采用惰性删除：
+        # 弹出时与条目当前的过期时间比对，不一致即为已失效的堆记录。
+        # seq 用于打破平局，避免比较不可排序的 key。
+        self._expiry_heap: list[tuple[int, int, Hashable]] = []
+        self._expiry_seq = itertools.count()
+        # 标签/类别反向索引，使按条件清理只触及匹配的键
+        self._by_tag: dict[str, set[Hashable]] = {}
+        self._by_category: dict[CacheCategory, set[Hashable]] = {}
+        # 访问频率草图，get 时（无论命中与否）计数，用于满容量时的准入判定
+        self._freq = _FrequencySketch(4 * int(settings.cache_maxsize))
 
     def should_cache_for_command(self, command: str) -> bool:
         cmd = command.strip()
         if not cmd:
             return False
-        if _SED_INPLACE_RE.search(cmd) is not None:
-            return False
-        if _SHELL_REDIRECT_RE.search(cmd) is not None:
-            return False
-        if _WRITE_COMMAND_RE.search(cmd) is not None:
-            return False
-        return True
+        return _UNCACHEABLE_COMMAND_RE.search(cmd) is None
 
     def _default_ttl_seconds(self, category: CacheCategory) -> int:
         if category == "static":
@@ -74,17 +148,16 @@ class CacheManager:
         return int(self._settings.dynamic_ttl_max_seconds)
 
     async def get(self, key: Hashable) -> Any | None:
-        now = self._time()
-        async with self._lock:
-            entry = self._data.get(key)
-            if entry is None:
-                return None
-            if now >= entry.expires_at_monotonic:
-                self._data.pop(key, None)
-                return None
+        self._freq.increment(key)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if self._time_ns() >= entry.expires_at_ns:
+            self._remove(key)
+            return None
 
-            self._data.move_to_end(key)
-            return entry.value
+        self._data.move_to_end(key)
+        return entry.value
 
     async def set(
         self,
@@ -94,24 +167,32 @@ class CacheManager:
         category: CacheCategory = "dynamic",
         ttl_seconds: int | None = None,
         tags: Iterable[str] = (),
+        force: bool = False,
     ) -> None:
         ttl = int(ttl_seconds) if ttl_seconds is not None else self._default_ttl_seconds(category)
         if ttl <= 0:
             return
 
-        now = self._time()
+        now = self._time_ns()
+        # force：调用方显式刷新（未经 get 探测，草图中可能没有该键的频率）时跳过准入判定
+        if not force and key not in self._data and not self._admit(key, now):
+            return
         entry = CacheEntry(
             value=value,
-            created_at_monotonic=now,
-            expires_at_monotonic=now + float(ttl),
+            created_at_ns=now,
+            expires_at_ns=now + ttl * _NS_PER_SECOND,
             category=category,
-            tags=frozenset(tags),
+            tags=frozenset(tags) if tags else _EMPTY_FROZENSET,
         )
 
-        async with self._lock:
-            self._data[key] = entry
-            self._data.move_to_end(key)
-            await self._evict_if_needed_unlocked()
+        self._remove(key)
+        self._data[key] = entry
+        self._index(key, entry)
+        heapq.heappush(
+            self._expiry_heap,
+            (entry.expires_at_ns, next(self._expiry_seq), key),
+        )
+        self._evict_if_needed()
 
     async def clear(
         self,
@@ -120,42 +201,108 @@ class CacheManager:
         tag: str | None = None,
         category: CacheCategory | None = None,
     ) -> int:
-        async with self._lock:
-            if keys is None and tag is None and category is None:
-                removed = len(self._data)
-                self._data.clear()
-                return removed
-
-            to_remove: set[Hashable] = set(keys or [])
-            if tag is not None or category is not None:
-                for k, v in self._data.items():
-                    if tag is not None and tag not in v.tags:
-                        continue
-                    if category is not None and v.category != category:
-                        continue
-                    to_remove.add(k)
-
-            removed = 0
-            for k in to_remove:
-                if k in self._data:
-                    self._data.pop(k, None)
-                    removed += 1
+        if keys is None and tag is None and category is None:
+            removed = len(self._data)
+            self._clear_all()
             return removed
 
-    async def get_info(self, *, head: int = 50) -> CacheInfo:
-        async with self._lock:
-            keys = [str(k) for k in list(self._data.keys())[-head:]]
-            return CacheInfo(
-                maxsize=int(self._settings.cache_maxsize),
-                size=len(self._data),
-                keys=keys,
+        to_remove: set[Hashable] = set(keys or [])
+        if tag is not None and category is not None:
+            to_remove |= self._by_tag.get(tag, _EMPTY_FROZENSET) & self._by_category.get(
+                category, _EMPTY_FROZENSET
             )
+        elif tag is not None:
+            to_remove |= self._by_tag.get(tag, _EMPTY_FROZENSET)
+        elif category is not None:
+            to_remove |= self._by_category.get(category, _EMPTY_FROZENSET)
+
+        removed = 0
+        for k in to_remove:
+            if self._remove(k) is not None:
+                removed += 1
+        return removed
+
+    async def get_info(self, *, head: int = 50) -> CacheInfo:
+        # 只从尾部（最近使用端）取 head 个键，不复制整个键列表；head<=0 时不返回键
+        keys = [str(k) for k in itertools.islice(reversed(self._data), max(head, 0))]
+        keys.reverse()
+        return CacheInfo(
+            maxsize=int(self._settings.cache_maxsize),
+            size=len(self._data),
+            keys=keys,
+        )
+
+    def iter_keys(self) -> Iterator[Hashable]:
+        """按LRU顺序（最久未使用在前）逐个产出缓存键。"""
+        yield from self._data
 
-    async def _evict_if_needed_unlocked(self) -> None:
+    def _admit(self, key: Hashable, now: int) -> bool:
+        maxsize = int(self._settings.cache_maxsize)
+        if len(self._data) < maxsize:
+            return True
+        self._purge_expired(now)
+        if len(self._data) < maxsize or not self._data:
+            return True
+        victim = next(iter(self._data))
+        return self._freq.estimate(key) >= self._freq.estimate(victim)
+
+    def _evict_if_needed(self) -> None:
         maxsize = int(self._settings.cache_maxsize)
         if maxsize <= 0:
-            self._data.clear()
+            self._clear_all()
             return
 
+        if len(self._data) > maxsize:
+            # 优先淘汰已过期条目，避免为腾出空间而驱逐仍有效的条目
+            self._purge_expired(self._time_ns())
         while len(self._data) > maxsize:
-            self._data.popitem(last=False)
+            self._remove(next(iter(self._data)))
+
+        # 覆盖写入与LRU淘汰会在堆中留下失效记录，超过阈值时重建
+        if len(self._expiry_heap) > 2 * len(self._data) + 64:
+            self._expiry_heap = [
+                item
+                for item in self._expiry_heap
+                if (e := self._data.get(item[2])) is not None
+                and e.expires_at_ns == item[0]
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _purge_expired(self, now: int) -> int:
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] <= now:
+            expires_at, _seq, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at_ns == expires_at:
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def _index(self, key: Hashable, entry: CacheEntry) -> None:
+        for t in entry.tags:
+            self._by_tag.setdefault(t, set()).add(key)
+        self._by_category.setdefault(entry.category, set()).add(key)
+
+    def _remove(self, key: Hashable) -> CacheEntry | None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        for t in entry.tags:
+            keys = self._by_tag.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[t]
+        keys = self._by_category.get(entry.category)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_category[entry.category]
+        return entry
+
+    def _clear_all(self) -> None:
+        self._data.clear()
+        self._expiry_heap.clear()
+        self._by_tag.clear()
+        self._by_category.clear()
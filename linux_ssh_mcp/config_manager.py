@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import importlib
 import json
 import os
+import sys
 from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +13,27 @@ from dotenv import dotenv_values
 
 from linux_ssh_mcp.settings import SSHMCPSettings
 
+try:  # 可选依赖：orjson 直接解析UTF-8字节，比标准库json更快
+    _orjson: Any = importlib.import_module("orjson")
+except ImportError:  # pragma: no cover - 未安装时回退到标准库json
+    _orjson = None
+
+
+def _loads_json(data: bytes) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=4)
+def _read_json_cached(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    # mtime_ns/size 仅作为缓存键：文件被修改后键变化，自动重新读取
+    raw = _loads_json(Path(path).read_bytes())
+    if not isinstance(raw, dict):
+        raise ValueError("配置文件必须是JSON对象")
+    # 驻留顶层键：后续与字段名字面量比较时可走指针相等的快速路径
+    return {sys.intern(key): value for key, value in raw.items()}
+
 
 class ConfigManager:
     def __init__(self, settings: SSHMCPSettings) -> None:
@@ -49,11 +73,8 @@ class ConfigManager:
 
     @staticmethod
     def _read_json(path: Path) -> dict[str, Any]:
-        with path.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
-        if not isinstance(raw, dict):
-            raise ValueError("配置文件必须是JSON对象")
-        return raw
+        st = path.stat()
+        return dict(_read_json_cached(str(path), st.st_mtime_ns, st.st_size))
 
     @staticmethod
     def _read_dotenv(path: Path, env_prefix: str) -> dict[str, Any]:
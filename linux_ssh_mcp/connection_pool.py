@@ -11,7 +11,7 @@ from __future__ import annotations
 
 import asyncio
 import time
-from collections.abc import AsyncIterator, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 
@@ -122,6 +122,7 @@ class ConnectionPool:
         settings: SSHMCPSettings,
         connect_timeout_seconds: int | None = None,
         time_provider: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
     ) -> None:
         """初始化连接池。
 
@@ -129,10 +130,12 @@ class ConnectionPool:
             settings: SSH MCP配置
             connect_timeout_seconds: 连接超时时间（秒），None表示无超时
             time_provider: 时间提供函数，用于测试注入
+            sleep: 后台清理循环的等待函数，用于测试注入
         """
         self._settings = settings
         self._connect_timeout_seconds = connect_timeout_seconds
         self._time = time_provider
+        self._sleep = sleep
 
         self._lock = asyncio.Lock()
         self._semaphores: dict[HostKey, asyncio.BoundedSemaphore] = {}
@@ -394,6 +397,8 @@ class ConnectionPool:
             return conn
         except Exception as exc:
             future.set_exception(exc)
+            # 异常已由本请求抛出，标记为已读取，避免无人合并时在回收阶段报告未读取异常
+            future.exception()
             raise
         finally:
             self._pending_connects.pop(pool_key, None)
@@ -455,7 +460,7 @@ class ConnectionPool:
         """
         while not self._closed:
             try:
-                await asyncio.sleep(_CLEANUP_INTERVAL_SECONDS)
+                await self._sleep(_CLEANUP_INTERVAL_SECONDS)
                 await self._cleanup_all_idle()
             except asyncio.CancelledError:
                 break
@@ -34,7 +34,7 @@ def _to_int(value: int | None) -> int:
     return int(value or 0)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransferResult:
     """文件传输结果数据类。
 
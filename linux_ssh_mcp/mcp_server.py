@@ -15,17 +15,21 @@
 """
 from __future__ import annotations
 
+import select
 import sys
 import traceback
-from collections.abc import AsyncIterator
+from collections import deque
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
-from io import TextIOWrapper
+from io import FileIO
 from pathlib import Path
 from tempfile import gettempdir
-from typing import Any, Literal, cast
+from types import CodeType
+from typing import Any, Literal, TypeVar, cast
 
 import anyio
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
 from mcp.server.stdio import stdio_server
 
 from linux_ssh_mcp.auth_manager import AuthManager, SSHCredentials
@@ -61,15 +65,121 @@ TokenMode = Literal["full", "filter", "truncate"]
 CacheCategory = Literal["static", "dynamic"]
 LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+# stdin 单次批量读取的字节数
+_STDIN_READ_SIZE: int = 65536
+
+
+class _BufferedStdinLines:
+    """按块读取文件描述符并切分为行的异步迭代器。
+
+    mcp 默认的 stdin 读取经 anyio.wrap_file 逐行转交线程池，每条消息都要
+    一次线程切换和一次 read 系统调用；这里每次批量读取 _STDIN_READ_SIZE 字节，
+    一次切换即可切出缓冲区中的全部完整消息（MCP stdio 以换行分帧）。
+    读取直接 readinto 预分配的固定缓冲区，不再为每次 read 新建 bytes 对象。
+    """
+
+    def __init__(self, fd: int, *, read_size: int = _STDIN_READ_SIZE) -> None:
+        # closefd=False：文件描述符归调用方所有，迭代器不负责关闭
+        self._file = FileIO(fd, "rb", closefd=False)
+        self._chunk = memoryview(bytearray(read_size))
+        self._buf = bytearray()
+        self._lines: deque[str] = deque()
+        self._eof = False
+
+    def __aiter__(self) -> _BufferedStdinLines:
+        return self
+
+    async def __anext__(self) -> str:
+        while not self._lines:
+            if self._eof:
+                raise StopAsyncIteration
+            n = await anyio.to_thread.run_sync(self._read_chunk)
+            if n:
+                self._buf += self._chunk[:n]
+                end = self._buf.rfind(b"\n")
+                if end < 0:
+                    continue
+                text = self._buf[:end].decode("utf-8", errors="replace")
+                del self._buf[: end + 1]
+            else:
+                self._eof = True
+                text = self._buf.decode("utf-8", errors="replace")
+                self._buf.clear()
+            self._lines.extend(line for line in text.split("\n") if line.strip())
+        return self._lines.popleft()
+
+    def _read_chunk(self) -> int:
+        # 宿主把 stdin 设为非阻塞时 readinto 可能因 EAGAIN 返回 None，
+        # 此时在工作线程中等到可读再重试；只有返回 0 才表示 EOF
+        while True:
+            n = self._file.readinto(self._chunk)
+            if n is not None:
+                return n
+            select.select((self._file,), (), ())
+
+
+class _BufferedStdoutWriter:
+    """按消息整块写出文件描述符的异步写入器。
+
+    mcp 默认把 stdout 经 anyio.wrap_file 包装，每条消息的 write 与 flush
+    各要一次线程切换；这里 write 只在事件循环内编码暂存，flush 时一次线程切换、
+    一次 write 系统调用写出暂存的全部数据。
+    """
+
+    def __init__(self, fd: int) -> None:
+        # closefd=False：文件描述符归调用方所有，写入器不负责关闭
+        self._file = FileIO(fd, "wb", closefd=False)
+        self._pending: list[bytes] = []
+
+    async def write(self, data: str) -> None:
+        self._pending.append(data.encode("utf-8", errors="replace"))
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        await anyio.to_thread.run_sync(self._write_all, data)
+
+    def _write_all(self, data: bytes) -> None:
+        # 管道写满时 write 可能只写出一部分；宿主把 stdout 设为非阻塞时还可能
+        # 因 EAGAIN 返回 None，此时在工作线程中等到可写再继续，而不是原地空转
+        view = memoryview(data)
+        while view:
+            written = self._file.write(view)
+            if written is None:
+                select.select((), (self._file,), ())
+                continue
+            view = view[written:]
+
+
+# 工具定义模板缓存，按函数的代码对象索引。
+# 每次 create_mcp_server 都会重新生成工具闭包，但闭包共享同一代码对象、签名与文档，
+# 因此参数模型与JSON Schema只需构建一次，之后仅替换绑定的函数。
+# 模板中的 fn 是占位函数，不持有任何一次调用的闭包，
+# 否则首个服务器的管理器（含缓存的凭据）会随模板常驻整个进程。
+_TOOL_TEMPLATES: dict[CodeType, Tool] = {}
+
+
+def _tool_placeholder(*_args: Any, **_kwargs: Any) -> Any:
+    raise RuntimeError("工具模板不可直接调用")
+
+
+def _build_tool(fn: Callable[..., Any]) -> Tool:
+    template = _TOOL_TEMPLATES.get(fn.__code__)
+    if template is None:
+        template = Tool.from_function(fn).model_copy(update={"fn": _tool_placeholder})
+        _TOOL_TEMPLATES[fn.__code__] = template
+    return template.model_copy(update={"fn": fn})
+
 
 def run_stdio_server(server: FastMCP) -> None:
     async def _run() -> None:
-        stdin = anyio.wrap_file(
-            TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace")
-        )
-        stdout = anyio.wrap_file(
-            TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-        )
+        stdin = cast(Any, _BufferedStdinLines(sys.stdin.fileno()))
+        stdout = cast(Any, _BufferedStdoutWriter(sys.stdout.fileno()))
         async with stdio_server(stdin=stdin, stdout=stdout) as (read_stream, write_stream):
             lowlevel = cast(Any, server)._mcp_server
             await lowlevel.run(
@@ -105,12 +215,11 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             await directory.close_all_sessions()
             await pool.close_all()
 
-    mcp = FastMCP(
-        name="linux-ssh-mcp",
-        instructions="Linux SSH远程命令执行与文件/目录操作工具",
-        log_level=cast(LogLevel, settings.log_level),
-        lifespan=lifespan,
-    )
+    tools: list[Tool] = []
+
+    def tool(fn: _F) -> _F:
+        tools.append(_build_tool(fn))
+        return fn
 
     def resolve_credentials(
         *,
@@ -131,7 +240,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             raise ValueError("未提供凭据，且keyring中未找到")
         return creds
 
-    @mcp.tool()
+    @tool
     def auth_store_credentials(
         *,
         host: str,
@@ -161,7 +270,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return {"ok": True, "host": host, "username": username}
 
-    @mcp.tool()
+    @tool
     async def ssh_execute(
         *,
         host: str,
@@ -197,7 +306,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return res.to_dict()
 
-    @mcp.tool()
+    @tool
     async def ssh_execute_batch(
         *,
         host: str,
@@ -246,7 +355,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return [r.to_dict() for r in results]
 
-    @mcp.tool()
+    @tool
     async def ssh_execute_script(
         *,
         host: str,
@@ -298,7 +407,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return res.to_dict()
 
-    @mcp.tool()
+    @tool
     async def ssh_system_info(
         *,
         host: str,
@@ -337,7 +446,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             force_refresh=force_refresh,
         )
 
-    @mcp.tool()
+    @tool
     async def ssh_session_info() -> SessionInfoResultDict:
         """查看当前会话缓存状态。
 
@@ -349,7 +458,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         """
         return await ssh.get_session_info()
 
-    @mcp.tool()
+    @tool
     async def ssh_search_content(
         *,
         host: str,
@@ -398,7 +507,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return res.to_dict()
 
-    @mcp.tool()
+    @tool
     async def ssh_clear_cache(
         *,
         keys: list[str] | None = None,
@@ -420,7 +529,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         """
         return await ssh.clear_cache(keys=keys, tag=tag, category=category)
 
-    @mcp.tool()
+    @tool
     async def ssh_health_check(
         *,
         host: str,
@@ -464,7 +573,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             "stderr": res.stderr.strip(),
         }
 
-    @mcp.tool()
+    @tool
     async def file_upload(
         *,
         host: str,
@@ -516,7 +625,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return res.to_dict()
 
-    @mcp.tool()
+    @tool
     async def file_download(
         *,
         host: str,
@@ -568,7 +677,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
         )
         return res.to_dict()
 
-    @mcp.tool()
+    @tool
     async def file_info(
         *,
         host: str,
@@ -606,7 +715,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             path=path,
         )
 
-    @mcp.tool()
+    @tool
     async def dir_list(
         *,
         host: str,
@@ -653,7 +762,7 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             filter_pattern=filter_pattern,
         )
 
-    @mcp.tool()
+    @tool
     async def dir_interactive(
         *,
         host: str,
@@ -698,4 +807,10 @@ def create_mcp_server(*, settings: SSHMCPSettings) -> FastMCP:
             close_session=close_session,
         )
 
-    return mcp
+    return FastMCP(
+        name="linux-ssh-mcp",
+        instructions="Linux SSH远程命令执行与文件/目录操作工具",
+        log_level=cast(LogLevel, settings.log_level),
+        lifespan=lifespan,
+        tools=tools,
+    )
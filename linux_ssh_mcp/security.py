@@ -9,12 +9,36 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from typing import cast
 
 from linux_ssh_mcp.exceptions import CommandBlockedError
 
+try:  # 可选依赖：google-re2 基于DFA匹配，无回溯风险且匹配期间释放GIL
+    import re2 as _re2
+except ImportError:  # pragma: no cover - 未安装时回退到标准库re
+    _re2 = None
+
+
+def _compile_rule(pattern: str) -> re.Pattern[str]:
+    """编译安全规则正则，优先使用re2，不可用或不支持时回退到re。
+
+    Args:
+        pattern: 正则表达式（标志需以内联形式给出，如 (?i)）
+
+    Returns:
+        编译后的正则对象
+    """
+    if _re2 is not None:
+        try:
+            return cast(re.Pattern[str], _re2.compile(pattern))
+        except Exception:  # re2 仅支持正则语法子集，不支持时回退
+            pass
+    return re.compile(pattern)
+
+
 # 黑名单正则：匹配到则直接拦截
-_BLACKLIST_RE = re.compile(
-    r"(?ix)"
+_BLACKLIST_RE = _compile_rule(
+    r"(?i)"
     r"("
     r"\brm\s+-rf\s+/"              # rm -rf /
     r"|\bmkfs\b"                   # 格式化文件系统
@@ -25,19 +49,43 @@ _BLACKLIST_RE = re.compile(
     r")"
 )
 
+# 危险命令列表，按实际使用中的命中频率从高到低排列，使正则尽早命中
+_DANGEROUS_COMMANDS: tuple[str, ...] = (
+    "rm", "chmod", "apt", "apt-get", "systemctl", "sed",
+    "mv", "cp", "chown", "tee", "service", "python", "perl",
+    "yum", "dnf", "dd", "truncate", "rmdir", "chgrp", "pacman",
+    "useradd", "userdel", "usermod", "groupadd", "groupdel", "groupmod",
+    "iptables", "ufw", "firewall-cmd",
+)
+
 # 危险命令正则：匹配到则附加警告
-_DANGEROUS_RE = re.compile(
-    r"(?ix)\b("
-    r"rm|rmdir|mv|cp|dd|truncate|chmod|chown|chgrp|"
-    r"sed|perl|python|tee|"
-    r"apt|apt-get|yum|dnf|pacman|systemctl|service|"
-    r"useradd|userdel|usermod|groupadd|groupdel|groupmod|"
-    r"iptables|ufw|firewall-cmd"
-    r")\b"
+_DANGEROUS_RE = _compile_rule(
+    r"(?i)\b(" + "|".join(re.escape(c) for c in _DANGEROUS_COMMANDS) + r")\b"
 )
 
+# 危险命令首字母（含大小写），文本中不含任一字符时可跳过正则匹配
+_DANGEROUS_FIRST_CHARS = frozenset(
+    ch for c in _DANGEROUS_COMMANDS for ch in (c[0].lower(), c[0].upper())
+)
+
+
+def _contains_dangerous_command(text: str) -> bool:
+    """检查文本中是否包含危险命令。
+
+    先做一次字符集预筛（C层面单次遍历），仅在可能命中时才执行正则。
+
+    Args:
+        text: 待检查的命令或脚本
+
+    Returns:
+        是否包含危险命令
+    """
+    if _DANGEROUS_FIRST_CHARS.isdisjoint(text):
+        return False
+    return _DANGEROUS_RE.search(text) is not None
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SecurityCheckResult:
     """安全校验结果。
 
@@ -104,7 +152,7 @@ class CommandSecurityValidator:
 
         # 危险命令警告
         warnings: list[str] = []
-        if _DANGEROUS_RE.search(cmd) is not None:
+        if _contains_dangerous_command(cmd):
             warnings.append("检测到高风险命令，请确认执行意图")
 
         return SecurityCheckResult(allowed=True, warnings=warnings)
@@ -125,7 +173,7 @@ class CommandSecurityValidator:
             return SecurityCheckResult(allowed=True, warnings=[])
 
         warnings: list[str] = []
-        if _DANGEROUS_RE.search(script) is not None:
+        if _contains_dangerous_command(script):
             warnings.append("脚本包含潜在高风险命令，请确认执行意图")
 
         return SecurityCheckResult(allowed=True, warnings=warnings)
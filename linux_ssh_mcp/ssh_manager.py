@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-import shlex
+import re
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Any, Literal, cast
 
@@ -9,6 +10,7 @@ import asyncssh
 from linux_ssh_mcp.auth_manager import SSHCredentials
 from linux_ssh_mcp.cache_manager import CacheCategory, CacheManager
 from linux_ssh_mcp.connection_pool import ConnectionPool
+from linux_ssh_mcp.constants import DEFAULT_SHELL
 from linux_ssh_mcp.security import CommandSecurityValidator
 from linux_ssh_mcp.settings import SSHMCPSettings
 from linux_ssh_mcp.token_optimizer import TokenOptimizer
@@ -21,6 +23,27 @@ from linux_ssh_mcp.types import (
 
 TokenMode = Literal["full", "filter", "truncate"]
 
+# get_system_info 中单条命令结果的字段顺序
+_RUN_RESULT_FIELDS: tuple[str, str, str] = ("exit_status", "stdout", "stderr")
+
+
+# 与 shlex.quote 相同的安全字符判定，模块加载时一次性编译
+_SHELL_UNSAFE_RE = re.compile(r"[^\w@%+=:,./-]", re.ASCII)
+
+
+def _fast_quote(value: str) -> str:
+    """对字符串进行Shell转义，语义与shlex.quote一致。
+
+    Args:
+        value: 待转义的字符串
+
+    Returns:
+        可安全拼接到Shell命令中的字符串
+    """
+    if value and _SHELL_UNSAFE_RE.search(value) is None:
+        return value
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
 
 def _to_text(value: str | bytes | None) -> str:
     """将可空的字符串或字节转换为字符串。
@@ -50,7 +73,7 @@ def _to_int(value: int | None) -> int:
     return int(value or 0)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SSHCommandResult:
     """SSH命令执行结果数据类。
 
@@ -107,6 +130,7 @@ class SSHManager:
 
     Attributes:
         _settings: SSH MCP配置
+        _cmd_timeout: 命令执行超时时间（秒），初始化时从配置换算一次
         _pool: SSH连接池
         _cache: 缓存管理器
         _token: Token优化器
@@ -132,6 +156,7 @@ class SSHManager:
             security_validator: 命令安全校验器，为None时使用默认校验器
         """
         self._settings = settings
+        self._cmd_timeout = float(settings.command_timeout_seconds)
         self._pool = pool
         self._cache = cache
         self._token = token_optimizer
@@ -205,7 +230,7 @@ class SSHManager:
             completed: asyncssh.SSHCompletedProcess = await conn.run(
                 cmd,
                 check=False,
-                timeout=float(self._settings.command_timeout_seconds),
+                timeout=self._cmd_timeout,
             )
 
         stdout = _to_text(completed.stdout)
@@ -257,6 +282,7 @@ class SSHManager:
         """批量执行多条SSH命令。
 
         在同一SSH连接内顺序执行多条命令，通过安全校验器检查每条命令。
+        需要流式消费结果时请使用 execute_batch_iter。
 
         Args:
             host: 目标主机地址
@@ -270,13 +296,57 @@ class SSHManager:
         Returns:
             list[SSHCommandResult]: 各命令执行结果列表
 
+        Raises:
+            CommandBlockedError: 任一命令命中黑名单时抛出
+        """
+        return [
+            r
+            async for r in self.execute_batch_iter(
+                host=host,
+                port=port,
+                credentials=credentials,
+                commands=commands,
+                token_mode=token_mode,
+                filter_pattern=filter_pattern,
+                max_tokens=max_tokens,
+            )
+        ]
+
+    async def execute_batch_iter(
+        self,
+        *,
+        host: str,
+        port: int,
+        credentials: SSHCredentials,
+        commands: list[str],
+        token_mode: TokenMode = "full",
+        filter_pattern: str | None = None,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[SSHCommandResult]:
+        """批量执行多条SSH命令，逐条产出结果。
+
+        与 execute_batch 行为一致，但每条命令完成后立即产出结果，
+        调用方可边执行边消费，避免同时持有所有命令的输出。
+        迭代期间会一直占用同一条池化连接。
+
+        Args:
+            host: 目标主机地址
+            port: SSH端口
+            credentials: SSH凭据
+            commands: 命令列表
+            token_mode: 输出模式
+            filter_pattern: 正则过滤模式
+            max_tokens: 最大Token数
+
+        Yields:
+            SSHCommandResult: 单条命令执行结果，顺序与commands一致
+
         Raises:
             CommandBlockedError: 任一命令命中黑名单时抛出
         """
         if not commands:
-            return []
+            return
 
-        results: list[SSHCommandResult] = []
         async with self._pool.acquire_connection(
             host=host,
             port=port,
@@ -293,7 +363,7 @@ class SSHManager:
                 completed: asyncssh.SSHCompletedProcess = await conn.run(
                     cmd,
                     check=False,
-                    timeout=float(self._settings.command_timeout_seconds),
+                    timeout=self._cmd_timeout,
                 )
                 stdout = _to_text(completed.stdout)
                 stderr = _to_text(completed.stderr)
@@ -304,23 +374,19 @@ class SSHManager:
                     max_tokens=max_tokens,
                 )
                 token_estimate = self._token.estimate_tokens(processed_stdout)
-                results.append(
-                    SSHCommandResult(
-                        host=host,
-                        port=port,
-                        command=cmd,
-                        exit_status=_to_int(completed.exit_status),
-                        stdout=processed_stdout,
-                        stderr=stderr,
-                        cached=False,
-                        warnings=warnings,
-                        token_mode=token_mode,
-                        token_estimate=token_estimate,
-                    )
+                yield SSHCommandResult(
+                    host=host,
+                    port=port,
+                    command=cmd,
+                    exit_status=_to_int(completed.exit_status),
+                    stdout=processed_stdout,
+                    stderr=stderr,
+                    cached=False,
+                    warnings=warnings,
+                    token_mode=token_mode,
+                    token_estimate=token_estimate,
                 )
 
-        return results
-
     async def execute_script(
         self,
         *,
@@ -328,7 +394,7 @@ class SSHManager:
         port: int,
         credentials: SSHCredentials,
         script: str,
-        shell: str = "/bin/bash",
+        shell: str = DEFAULT_SHELL,
         token_mode: TokenMode = "full",
         filter_pattern: str | None = None,
         max_tokens: int | None = None,
@@ -357,8 +423,10 @@ class SSHManager:
         if not script.strip():
             raise ValueError("script不能为空")
 
-        cmd = f"{shlex.quote(shell)} -s"
-        self._security.validate_command(cmd)
+        cmd = f"{_fast_quote(shell)} -s"
+        # 默认解释器拼出的命令是固定的，不可能命中黑名单；仅自定义shell需要校验
+        if shell != DEFAULT_SHELL:
+            self._security.validate_command(cmd)
 
         script_check = self._security.validate_script(script)
         warnings = list(script_check.warnings)
@@ -372,7 +440,7 @@ class SSHManager:
                 cmd,
                 input=script,
                 check=False,
-                timeout=float(self._settings.command_timeout_seconds),
+                timeout=self._cmd_timeout,
             )
 
         stdout = _to_text(completed.stdout)
@@ -430,13 +498,19 @@ class SSHManager:
                 completed: asyncssh.SSHCompletedProcess = await conn.run(
                     c,
                     check=False,
-                    timeout=float(self._settings.command_timeout_seconds),
+                    timeout=self._cmd_timeout,
+                )
+                values[k] = dict(
+                    zip(
+                        _RUN_RESULT_FIELDS,
+                        (
+                            _to_int(completed.exit_status),
+                            _to_text(completed.stdout).strip(),
+                            _to_text(completed.stderr).strip(),
+                        ),
+                        strict=True,
+                    )
                 )
-                values[k] = {
-                    "exit_status": _to_int(completed.exit_status),
-                    "stdout": _to_text(completed.stdout).strip(),
-                    "stderr": _to_text(completed.stderr).strip(),
-                }
 
         # Cast to SystemInfoResultDict since we know the keys match
         result = cast(SystemInfoResultDict, values)
@@ -447,6 +521,7 @@ class SSHManager:
             category="static",
             ttl_seconds=int(self._settings.static_ttl_max_seconds),
             tags=["system", host],
+            force=force_refresh,
         )
         return result
 
@@ -476,8 +551,8 @@ class SSHManager:
         if not path.strip():
             raise ValueError("path不能为空")
 
-        q = shlex.quote(query)
-        p = shlex.quote(path)
+        q = _fast_quote(query)
+        p = _fast_quote(path)
         cmd = f"grep -R -n --binary-files=without-match -- {q} {p} || true"
         return await self.execute_command(
             host=host,
@@ -1,55 +1,582 @@
 from __future__ import annotations
 
+import importlib
 import re
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, cast
 
+try:  # 可选依赖：pyahocorasick 一次扫描即可定位任意多个字面量，与字面量个数无关
+    _ahocorasick: Any = importlib.import_module("ahocorasick")
+except ImportError:  # pragma: no cover - 未安装时回退到正则分支匹配
+    _ahocorasick = None
+
+try:  # 可选依赖：hyperscan 以 SIMD 扫描整段文本，命中稀疏的大段输出上远快于 re
+    _hyperscan: Any = importlib.import_module("hyperscan")
+except ImportError:  # pragma: no cover - 未安装时只使用 re
+    _hyperscan = None
+
+try:  # 可选依赖：regex 支持匹配超时，防止客户端传入的模式灾难性回溯卡住事件循环
+    _regex: Any = importlib.import_module("regex")
+except ImportError:  # pragma: no cover - 未安装时使用不带超时的 re
+    _regex = None
+
+
+# 跨实例共享的正则编译缓存；re 模块自带的缓存容量较小，且每次仍需查表与类型判断
+@lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    return re.compile(pattern, flags)
+
+
+# 一次过滤（或一次分支重排）内全部匹配调用共享的时间预算（秒）：固定基数加按输入大小的配额，
+# 超出即视为灾难性回溯。正常模式逐行匹配约 0.1 秒/MiB，大输出不会因总量大而被误判
+_FILTER_TIMEOUT = 0.5
+_FILTER_TIMEOUT_PER_MIB = 2.0
+
+
+@lru_cache(maxsize=256)
+def _compile_guarded(pattern: str, flags: int = 0) -> tuple[Any, bool]:
+    """返回 (编译结果, 匹配调用是否支持 timeout 参数)，用于在文本上执行客户端传入的模式。
+
+    装有 regex 时用它编译（flags 仅用到 MULTILINE，两个模块取值相同）；
+    regex 不支持的语法回退到不带超时的 re。
+    """
+    if _regex is not None:
+        try:
+            return _regex.compile(pattern, flags), True
+        except Exception:  # regex 与 re 的语法并非完全一致，不支持时回退
+            pass
+    return _compile(pattern, flags), False
+
+
+def _filter_deadline(text_len: int) -> float:
+    return time.monotonic() + _FILTER_TIMEOUT + _FILTER_TIMEOUT_PER_MIB * text_len / (1 << 20)
+
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("regex timed out")
+    return remaining
+
+
+def _guarded_search(pattern: str, flags: int, deadline: float) -> Callable[..., Any]:
+    """返回 pattern 的 search；支持超时时每次调用只给 deadline 前剩余的时间。
+
+    超时作用于截至 deadline 的全部调用之和，而不是单次调用，
+    逐行匹配 N 行也不会累计出 N 倍的阻塞时间。
+    """
+    compiled, guarded = _compile_guarded(pattern, flags)
+    search = compiled.search
+    if not guarded:
+        return cast(Callable[..., Any], search)
+
+    def bounded(string: str, pos: int = 0) -> Any:
+        return search(string, pos, timeout=_remaining(deadline))
+
+    return bounded
+
+
+# 按 1 token/字计数的 CJK 统一表意文字区段（基本区及扩展 A~E），由正则引擎在 C 层统计
+_CJK_RE = re.compile(
+    "[\u4e00-\u9fff\u3400-\u4dbf\U00020000-\U0002a6df\U0002a700-\U0002b73f"
+    "\U0002b740-\U0002b81f\U0002b820-\U0002ceaf]"
+)
+
+# 只缓存不超过该长度的文本，限制缓存持有的内存（最坏约 maxsize * 该长度 个字符）
+_ESTIMATE_CACHE_MAX_LEN = 8192
+
+
+# 计数在 sre 的 C 循环中完成（约 40ms/百万字符），纯 ASCII 文本更是 O(1) 直接返回；
+# 不为长文本引入 numpy 这样的重量级依赖
+def _count_tokens(text: str) -> int:
+    cjk_count = _CJK_RE.subn("", text)[1]
+    return cjk_count + max(1, (len(text) - cjk_count) // 4)
+
+
+# 同一段输出常被反复估算（截断、过滤后再统计）；键为文本本身，
+# str 会缓存自身哈希，命中时无需重新扫描，也不存在哈希截断带来的碰撞误判
+_count_tokens_cached = lru_cache(maxsize=1024)(_count_tokens)
+
+# str.splitlines 视为换行、但多行正则的 ^/$ 不认作行边界的字符；出现时走逐行路径。
+# 逐个用 in 检查（memchr 级别），比字符类正则扫描整段文本快得多
+_ASCII_EXTRA_LINE_BREAKS = ("\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e")
+_EXTRA_LINE_BREAKS = (*_ASCII_EXTRA_LINE_BREAKS, "\x85", "\u2028", "\u2029")
+# 在整段文本上语义与逐行不同的构造：文本首尾锚点、可越过换行窥视的零宽断言；
+# 占有量词与原子组吞下换行后匹配失败不会回溯，命中不跨行，跨行检查也就发现不了；
+# \B 在整段文本的空行上成立，而逐行匹配空串时不成立
+_WHOLE_TEXT_SENSITIVE = (
+    "\\A",
+    "\\Z",
+    "(?=",
+    "(?!",
+    "(?<",
+    "(?>",
+    "*+",
+    "++",
+    "?+",
+    "}+",
+    "\\B",
+)
+
+# 模式开头的全局内联标志，如 (?i)
+_GLOBAL_FLAGS_RE = re.compile(r"\(\?[aiLmsux]+\)")
+# 开头可省略的 .* / ^.*（可带惰性 ?），其后不能紧跟会改变含义的量词字符
+_LEADING_WILDCARD_RE = re.compile(r"\^?\.\*\??(?![*+?{])")
+# 结尾可省略的 .* / .*$（可带惰性 ?）
+_TRAILING_WILDCARD_RE = re.compile(r"\.\*\??\$?\Z")
+
+
+def _strip_redundant_wildcards(pattern: str) -> str:
+    """去掉行内搜索时冗余的首尾 .*。
+
+    在单行内 search，``.*X`` / ``^.*X`` 与 ``X``、``X.*`` / ``X.*$`` 与 ``X`` 的命中行完全相同；
+    但 .* 会先吞到行尾再逐字符回溯，在长行和不命中的行上代价为 O(行长²)。
+    改写不会把 .*X 换成 [^X]*X 之类的形式，那在有锚点时并不等价。
+    """
+    m = _GLOBAL_FLAGS_RE.match(pattern)
+    flags = m.group(0) if m else ""
+    body = pattern[len(flags) :]
+    lead = _LEADING_WILDCARD_RE.match(body)
+    if lead is not None:
+        body = body[lead.end() :]
+    trail = _TRAILING_WILDCARD_RE.search(body)
+    if trail is not None:
+        # 前面的反斜杠为奇数个时，这个 . 是转义的字面量点号
+        backslashes = len(body[: trail.start()]) - len(body[: trail.start()].rstrip("\\"))
+        if backslashes % 2 == 0:
+            body = body[: trail.start()]
+    return flags + body
+
+
+# 重排顶层分支会改变分组编号，含反向引用或条件分组时不能重排
+_GROUP_NUMBER_SENSITIVE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+# 用于统计各分支命中率的样本长度；排序结果按 (模式, 样本前缀哈希) 缓存
+_PATTERN_SAMPLE_LEN = 4096
+_PATTERN_SAMPLE_KEY_LEN = 256
+_ORDERED_PATTERNS_MAXSIZE = 256
+_ordered_patterns: OrderedDict[tuple[str, int], str] = OrderedDict()
+
+
+@lru_cache(maxsize=256)
+def _split_top_level_alternatives(pattern: str) -> tuple[str, tuple[str, ...]]:
+    """把模式拆成 (开头的全局标志, 顶层 | 分支)；不可安全重排时只返回一个分支。
+
+    跳过转义字符，字符类与括号分组内的 | 不作为分隔符。
+    """
+    m = _GLOBAL_FLAGS_RE.match(pattern)
+    flags = m.group(0) if m else ""
+    body = pattern[len(flags) :]
+    # 冗长模式下空白与 # 注释另有含义，不做拆分
+    if "x" in flags or _GROUP_NUMBER_SENSITIVE_RE.search(body) is not None:
+        return flags, (body,)
+
+    parts: list[str] = []
+    depth = 0
+    in_class = False
+    start = 0
+    i = 0
+    n = len(body)
+    while i < n:
+        ch = body[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if in_class:
+            if ch == "]":
+                in_class = False
+        elif ch == "[":
+            in_class = True
+            # 紧跟在 [ 或 [^ 之后的 ] 是字面量
+            i += 1
+            if i < n and body[i] == "^":
+                i += 1
+            if i < n and body[i] == "]":
+                i += 1
+            continue
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            parts.append(body[start:i])
+            start = i + 1
+        i += 1
+    parts.append(body[start:])
+    return flags, tuple(parts)
+
+
+def _count_matches(pattern: str, sample: str, deadline: float) -> int:
+    compiled, guarded = _compile_guarded(pattern, re.MULTILINE)
+    if guarded:
+        return len(compiled.findall(sample, timeout=_remaining(deadline)))
+    return len(compiled.findall(sample))
+
+
+def _optimize_pattern(pattern: str, sample: str) -> str:
+    """按各顶层分支在 sample 上的命中次数降序重排 A|B|C。
+
+    filter_by_pattern 只关心一行是否存在命中，而某位置上能否匹配与分支先后无关，
+    重排不改变结果；常命中的分支排在前面，命中行上可更早结束分支尝试。
+    含反向引用、条件分组或冗长模式时原样返回。
+
+    统计命中本身要对样本逐分支扫描，filter_by_pattern 不会自动调用；
+    适合对同类输出反复使用同一模式时，由调用方先优化一次再复用结果。
+    """
+    flags, alternatives = _split_top_level_alternatives(pattern)
+    if len(alternatives) < 2:
+        return pattern
+    key = (pattern, hash(sample[:_PATTERN_SAMPLE_KEY_LEN]))
+    cached = _ordered_patterns.get(key)
+    if cached is not None:
+        _ordered_patterns.move_to_end(key)
+        return cached
+
+    sample = sample[:_PATTERN_SAMPLE_LEN]
+    try:
+        deadline = _filter_deadline(len(sample))
+        hits = [_count_matches(flags + alt, sample, deadline) for alt in alternatives]
+    except re.error:
+        optimized = pattern
+    else:
+        # 稳定排序：命中次数相同的分支保持原有先后
+        order = sorted(range(len(alternatives)), key=hits.__getitem__, reverse=True)
+        optimized = flags + "|".join(alternatives[i] for i in order)
+        try:
+            # 如分支里的 (?m) 之类只能出现在模式开头的标志，换位后便无法编译
+            _compile(optimized)
+        except re.error:
+            optimized = pattern
+
+    _ordered_patterns[key] = optimized
+    if len(_ordered_patterns) > _ORDERED_PATTERNS_MAXSIZE:
+        _ordered_patterns.popitem(last=False)
+    return optimized
+
+
+def _has_extra_line_breaks(text: str) -> bool:
+    # isascii() 只读字符串头部的类型标记，是 O(1) 的
+    breaks = _ASCII_EXTRA_LINE_BREAKS if text.isascii() else _EXTRA_LINE_BREAKS
+    return any(ch in text for ch in breaks)
+
+
+# 出现任一字符即不视为纯字面量（{ 单独出现虽是字面量，这里从严处理）
+_REGEX_METACHARS = frozenset("\\.^$*+?{}[]|()")
 
-class TokenOptimizer:
-    def filter_by_pattern(self, text: str, *, pattern: str) -> str:
-        compiled = re.compile(pattern)
-        lines = text.splitlines()
-        filtered = [line for line in lines if compiled.search(line) is not None]
-        return "\n".join(filtered)
-
-    def estimate_tokens(self, text: str) -> int:
-        if not text:
-            return 0
-
-        cjk_count = 0
-        other_count = 0
-        for ch in text:
-            code = ord(ch)
-            if (
-                0x4E00 <= code <= 0x9FFF
-                or 0x3400 <= code <= 0x4DBF
-                or 0x20000 <= code <= 0x2A6DF
-                or 0x2A700 <= code <= 0x2B73F
-                or 0x2B740 <= code <= 0x2B81F
-                or 0x2B820 <= code <= 0x2CEAF
-            ):
-                cjk_count += 1
-            else:
-                other_count += 1
 
-        return cjk_count + max(1, other_count // 4)
+@lru_cache(maxsize=256)
+def _anchored_literal(pattern: str) -> str | None:
+    """pattern 形如 ^字面量 时返回该字面量，否则返回 None。
 
-    def truncate_by_tokens(self, text: str, *, max_tokens: int, suffix: str = "...") -> str:
-        if max_tokens <= 0:
-            return ""
-        if self.estimate_tokens(text) <= max_tokens:
+    不带锚点的纯字面量不在此列：sre 对字面量前缀本身就有快速查找，
+    实测与 str.find 循环相当，没有必要另走一条路径。
+    """
+    if not pattern.startswith("^"):
+        return None
+    literal = pattern[1:]
+    if not literal or "\n" in literal or not _REGEX_METACHARS.isdisjoint(literal):
+        return None
+    return literal
+
+
+def _filter_line_prefix(text: str, prefix: str) -> str:
+    """保留以 prefix 开头的行：行首命中即 "\n" + prefix，用 str.find 逐个定位，无需正则。"""
+    if text.endswith("\n"):
+        text = text[:-1]
+    find = text.find
+    n = len(text)
+    size = len(prefix)
+    out: list[str] = []
+    pos = 0
+    # 第一行前面没有换行符，单独判断
+    if text.startswith(prefix):
+        pos = find("\n", size)
+        if pos == -1:
             return text
+        out.append(text[:pos])
+    needle = "\n" + prefix
+    while True:
+        i = find(needle, pos)
+        if i == -1:
+            break
+        end = find("\n", i + 1 + size)
+        if end == -1:
+            end = n
+        out.append(text[i + 1 : end])
+        pos = end
+    return "\n".join(out)
+
+
+@lru_cache(maxsize=64)
+def _literal_alternatives(pattern: str) -> tuple[str, ...] | None:
+    """pattern 为至少两个纯字面量组成的顶层分支（如 foo|bar|baz）时返回各字面量。"""
+    flags, alternatives = _split_top_level_alternatives(pattern)
+    if flags or len(alternatives) < 2:
+        return None
+    for alt in alternatives:
+        if not alt or "\n" in alt or not _REGEX_METACHARS.isdisjoint(alt):
+            return None
+    return alternatives
+
+
+@lru_cache(maxsize=16)
+def _build_automaton(literals: tuple[str, ...]) -> Any:
+    automaton = _ahocorasick.Automaton()
+    for literal in literals:
+        automaton.add_word(literal, len(literal))
+    automaton.make_automaton()
+    return automaton
+
+
+def _filter_by_automaton(text: str, automaton: Any) -> str:
+    """用 Aho-Corasick 自动机单次扫描整段文本，把命中扩展到所在整行。
+
+    automaton.iter 带起始位置调用时每次都会重新转换整段文本，
+    因此只做一次完整迭代，跳过落在已输出行内的命中。
+    """
+    if text.endswith("\n"):
+        text = text[:-1]
+    find = text.find
+    rfind = text.rfind
+    n = len(text)
+    out: list[str] = []
+    line_end = -1
+    # 命中按结束位置递增给出；字面量不含换行，结束位置在已输出行内即属同一行
+    for end, size in automaton.iter(text):
+        if end < line_end:
+            continue
+        line_end = find("\n", end + 1)
+        if line_end == -1:
+            line_end = n
+        out.append(text[rfind("\n", 0, end - size + 1) + 1 : line_end])
+    return "\n".join(out)
+
+
+# 短文本上编码与回调的固定开销抵消了 hyperscan 的扫描优势
+_HYPERSCAN_MIN_LEN = 64 * 1024
+# hyperscan 对每个结束位置都回调一次 Python；样本中命中行占比超过 1/该值 时仍用 re
+_HYPERSCAN_MAX_HIT_RATIO = 16
+
+
+@lru_cache(maxsize=64)
+def _hyperscan_database(pattern: str) -> Any:
+    """以预过滤模式编译：报告的命中是真实命中的超集，确认交给 re，结果与 re 一致。
+
+    模式含整段语义不同的构造，或 hyperscan 无法编译（如可匹配空串）时返回 None。
+    """
+    if any(token in pattern for token in _WHOLE_TEXT_SENSITIVE):
+        return None
+    database = _hyperscan.Database()
+    try:
+        database.compile(
+            expressions=[pattern.encode()],
+            flags=[
+                _hyperscan.HS_FLAG_MULTILINE
+                | _hyperscan.HS_FLAG_UTF8
+                | _hyperscan.HS_FLAG_UCP
+                | _hyperscan.HS_FLAG_PREFILTER
+            ],
+        )
+    except Exception:  # hyperscan 与 re 的语法并不完全一致，不支持时回退
+        return None
+    return database
+
+
+def _sparse_hits(text: str, pattern: str, deadline: float) -> bool:
+    search = _guarded_search(pattern, 0, deadline)
+    lines = text[:_PATTERN_SAMPLE_LEN].splitlines()
+    hits = sum(1 for line in lines if search(line) is not None)
+    return hits * _HYPERSCAN_MAX_HIT_RATIO <= len(lines)
+
+
+def _filter_by_hyperscan(data: bytes, database: Any, pattern: str, deadline: float) -> str:
+    """hyperscan 扫描 UTF-8 字节定位候选行，再用 re 在该行上确认。
+
+    回调只拿到命中的结束位置；结束位置落在已处理行内的命中直接忽略。
+    """
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    search = _guarded_search(pattern, 0, deadline)
+    find = data.find
+    rfind = data.rfind
+    n = len(data)
+    out: list[str] = []
+    line_end = -1
+
+    def on_match(_id: int, _start: int, end: int, _flags: int, _context: Any) -> None:
+        nonlocal line_end
+        if end <= line_end:
+            return
+        start = rfind(b"\n", 0, end) + 1
+        line_end = find(b"\n", end)
+        if line_end == -1:
+            line_end = n
+        line = data[start:line_end].decode()
+        if search(line) is not None:
+            out.append(line)
+
+    database.scan(data, match_event_handler=on_match)
+    return "\n".join(out)
+
+
+def _filter_multiline(text: str, pattern: str, deadline: float) -> str | None:
+    """用多行模式在整段文本上逐个定位命中，再扩展到所在整行。
+
+    每找到一处命中即跳到下一行继续 search，未命中的行完全在 C 层扫描，
+    无需 splitlines 生成行列表再逐行调用 search。
+    模式含整段语义不同的构造，或命中跨越换行（模式本身能匹配换行，如 \\s*）时
+    返回 None，由调用方退回逐行匹配。
+
+    CPython 的 re 在匹配期间不释放 GIL，把文本按行切块交给线程池并不能并行，
+    只会多出切片与调度开销，因此这里保持单线程整段扫描。
+    """
+    if any(token in pattern for token in _WHOLE_TEXT_SENSITIVE):
+        return None
+    # 纯 ASCII 的 str 在 CPython 中本就是每字符 1 字节的紧凑存储，sre 直接在其上匹配；
+    # 先编码成 bytes 再用 bytes 模式匹配并不更快，反而多出编码与结果解码的开销
+    search = _guarded_search(pattern, re.MULTILINE, deadline)
+    if text.endswith("\n"):
+        # 与 splitlines 一致：末尾换行之后不再有空行
+        text = text[:-1]
+    find = text.find
+    n = len(text)
+    out: list[str] = []
+    pos = 0
+    while pos <= n:
+        m = search(text, pos)
+        if m is None:
+            break
+        start = m.start()
+        end = find("\n", start)
+        if end == -1:
+            end = n
+        elif end < m.end():
+            return None
+        out.append(text[text.rfind("\n", 0, start) + 1 : end])
+        pos = end + 1
+    # join 先累计总长度、一次分配结果再逐段拷贝；StringIO/bytearray 逐行写入反而慢约 10 倍
+    return "\n".join(out)
 
-        lo = 0
-        hi = len(text)
-        while lo < hi:
-            mid = (lo + hi) // 2
-            candidate = text[:mid] + suffix
-            if self.estimate_tokens(candidate) <= max_tokens:
-                lo = mid + 1
+
+def _estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+
+    # 纯 ASCII 文本不可能含 CJK 字符，isascii() 为 O(1)，无需计数也无需缓存
+    if text.isascii():
+        return max(1, len(text) // 4)
+    if len(text) <= _ESTIMATE_CACHE_MAX_LEN:
+        return _count_tokens_cached(text)
+    return _count_tokens(text)
+
+
+def _truncate(text: str, max_tokens: int, suffix: str) -> str:
+    # 每个字符至少贡献 1/4 token，长于 limit 的前缀必然超出预算：
+    # 截断点只会落在 text[:limit] 内，更长的文本也无需完整估算
+    limit = 4 * max_tokens + 8
+    if len(text) < limit and _estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 前缀 text[:k] 的 CJK 数由 CJK 位置表二分得到，二分查找截断点时
+    # 无需每一步都拼接候选字符串并重新完整估算
+    hi = min(len(text), limit)
+    cjk_positions = [] if text.isascii() else [m.start() for m in _CJK_RE.finditer(text, 0, hi)]
+    suffix_cjk = 0 if suffix.isascii() else _CJK_RE.subn("", suffix)[1]
+    suffix_len = len(suffix)
+
+    def fits(k: int) -> bool:
+        # 等价于 _estimate_tokens(text[:k] + suffix) <= max_tokens
+        cjk = bisect_left(cjk_positions, k) + suffix_cjk
+        return cjk + max(1, (k + suffix_len - cjk) // 4) <= max_tokens
+
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid + 1
+        else:
+            hi = mid
+
+    cut = max(0, lo - 1)
+    if cut <= 0:
+        return suffix if _estimate_tokens(suffix) <= max_tokens else ""
+    return text[:cut] + suffix
+
+
+# 同一段输出常先估算、再按同一预算截断；键含完整文本与参数，长度上限同估算缓存
+_truncate_cached = lru_cache(maxsize=256)(_truncate)
+
+
+def _filter_by_regex(text: str, pattern: str, single_breaks: bool) -> str:
+    deadline = _filter_deadline(len(text))
+    if _hyperscan is not None and single_breaks and len(text) >= _HYPERSCAN_MIN_LEN:
+        database = _hyperscan_database(pattern)
+        if database is not None and _sparse_hits(text, pattern, deadline):
+            try:
+                data = text.encode()
+            except UnicodeEncodeError:  # 含代理码位等无法编码为 UTF-8 的字符
+                pass
             else:
-                hi = mid
+                return _filter_by_hyperscan(data, database, pattern, deadline)
+
+    if single_breaks:
+        result = _filter_multiline(text, pattern, deadline)
+        if result is not None:
+            return result
+
+    search = _guarded_search(pattern, 0, deadline)
+    # 空行的结果对所有空行都相同，用 re 求一次：regex 的 \B 在空串上成立而 re 不成立，
+    # 空串上也不会发生灾难性回溯
+    empty_hit = _compile(pattern).search("") is not None
+    return "\n".join(
+        line for line in text.splitlines() if (search(line) is not None if line else empty_hit)
+    )
+
+
+def _filter_by_pattern(text: str, *, pattern: str) -> str:
+    """保留 text 中与 pattern 匹配（行内任意位置）的行，以换行连接返回。
+
+    模式逐行匹配，不会跨越换行。装有 regex 时整次过滤共享一份随输入大小增长的时间预算，
+    全部匹配累计超出预算会抛出 ValueError。
+    """
+    pattern = _strip_redundant_wildcards(pattern)
+    single_breaks = not _has_extra_line_breaks(text)
+    prefix = _anchored_literal(pattern)
+    if prefix is not None:
+        if single_breaks:
+            return _filter_line_prefix(text, prefix)
+        return "\n".join(line for line in text.splitlines() if line.startswith(prefix))
+
+    if _ahocorasick is not None and single_breaks:
+        literals = _literal_alternatives(pattern)
+        if literals is not None:
+            return _filter_by_automaton(text, _build_automaton(literals))
+
+    try:
+        return _filter_by_regex(text, pattern, single_breaks)
+    except TimeoutError as exc:
+        raise ValueError("filter_pattern匹配超时，模式可能存在灾难性回溯，请简化后重试") from exc
+
+
+def _truncate_by_tokens(text: str, *, max_tokens: int, suffix: str = "...") -> str:
+    if max_tokens <= 0:
+        return ""
+    # 纯 ASCII 文本的截断只是 O(log n) 的二分，缓存反而多出哈希与查表
+    if not text.isascii() and len(text) <= _ESTIMATE_CACHE_MAX_LEN:
+        return _truncate_cached(text, max_tokens, suffix)
+    return _truncate(text, max_tokens, suffix)
+
+
+class TokenOptimizer:
+    """以上模块级函数的门面；不持有任何状态，实例可随意共享或新建。
 
-        cut = max(0, lo - 1)
-        if cut <= 0:
-            return suffix if self.estimate_tokens(suffix) <= max_tokens else ""
-        return text[:cut] + suffix
+    方法以 staticmethod 形式直接绑定模块函数，调用时不经过 self 的属性查找与额外一层转发。
+    """
 
+    filter_by_pattern = staticmethod(_filter_by_pattern)
+    optimize_pattern = staticmethod(_optimize_pattern)
+    estimate_tokens = staticmethod(_estimate_tokens)
+    truncate_by_tokens = staticmethod(_truncate_by_tokens)
@@ -1,11 +1,14 @@
 from linux_ssh_mcp.config_manager import ConfigManager
 from linux_ssh_mcp.logger import setup_logger
-from linux_ssh_mcp.mcp_server import create_mcp_server, run_stdio_server
 
 
 def main() -> int:
     config_manager = ConfigManager.load()
     setup_logger(config_manager.settings)
+
+    # 延迟导入：mcp/asyncssh 依赖树较重，在配置与日志就绪后再加载
+    from linux_ssh_mcp.mcp_server import create_mcp_server, run_stdio_server
+
     server = create_mcp_server(settings=config_manager.settings)
     run_stdio_server(server)
     return 0
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from linux_ssh_mcp.auth_manager import SSHCredentials
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+
+class FakeCompleted:
+    """模拟 asyncssh.SSHCompletedProcess 的最小结果对象。"""
+
+    def __init__(self, *, stdout: str, stderr: str = "", exit_status: int = 0) -> None:
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_status = exit_status
+
+
+class FakeConn:
+    """按命令子串返回预设输出的假连接，并记录每次调用。"""
+
+    def __init__(self, responses: Mapping[str, str], default: str) -> None:
+        self._responses = responses
+        self._default = default
+        self.calls: list[tuple[str, str | None]] = []
+
+    async def run(self, command: str, *, input=None, **_kwargs):
+        self.calls.append((command, input))
+        for needle, stdout in self._responses.items():
+            if needle in command:
+                return FakeCompleted(stdout=stdout)
+        return FakeCompleted(stdout=self._default)
+
+
+class FakeLeased:
+    def __init__(self, conn: Any) -> None:
+        self.connection = conn
+        self.released = False
+        self.closed = False
+
+    async def release(self, *, close: bool = False) -> None:
+        self.released = True
+        self.closed = close
+
+
+class _AcquireCM:
+    """acquire_connection 返回的异步上下文管理器，直接交出给定连接。"""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: Any) -> None:
+        self._conn = conn
+
+    async def __aenter__(self) -> Any:
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+class FakePool:
+    """只实现管理器用到的 acquire/lease 接口，始终交出同一个假连接。"""
+
+    def __init__(self, conn: Any) -> None:
+        self._conn = conn
+        self.leased: FakeLeased | None = None
+
+    def acquire_connection(self, *, host: str, port: int, credentials: SSHCredentials):
+        return _AcquireCM(self._conn)
+
+    async def lease_connection(self, *, host: str, port: int, credentials: SSHCredentials):
+        self.leased = FakeLeased(self._conn)
+        return self.leased
+
+
+@pytest.fixture
+def fake_completed() -> type[FakeCompleted]:
+    """返回 FakeCompleted 构造器，供各测试模块的专用假连接使用。"""
+    return FakeCompleted
+
+
+@pytest.fixture
+def make_fake_conn() -> Callable[..., FakeConn]:
+    """返回构造新 FakeConn 的工厂，每次调用都是独立实例。"""
+
+    def _make(responses: Mapping[str, str] | None = None, *, default: str = "") -> FakeConn:
+        return FakeConn(dict(responses or {}), default)
+
+    return _make
+
+
+@pytest.fixture
+def make_fake_pool() -> Callable[[Any], FakePool]:
+    """返回把给定连接包装成 FakePool 的工厂。"""
+    return FakePool
+
+
+@pytest.fixture(scope="session")
+def creds() -> SSHCredentials:
+    """整个测试会话共享的无密码测试凭据（SSHCredentials 不可变，可安全共享）。"""
+    return SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
+
+
+@pytest.fixture(scope="session")
+def creds_pw() -> SSHCredentials:
+    """整个测试会话共享的带密码测试凭据。"""
+    return SSHCredentials(host="1.2.3.4", username="root", password="p", private_key_path=None)
+
+
+@pytest.fixture
+def fake_keyring(monkeypatch: pytest.MonkeyPatch) -> dict[tuple[str, str], str]:
+    """用内存字典替换 keyring 的读写接口，返回底层存储。"""
+    store: dict[tuple[str, str], str] = {}
+    monkeypatch.setattr("keyring.set_password", lambda s, k, p: store.__setitem__((s, k), p))
+    monkeypatch.setattr("keyring.get_password", lambda s, k: store.get((s, k)))
+    return store
+
+
+@pytest.fixture(scope="module")
+def mcp_server() -> FastMCP:
+    """按模块共享的默认配置 MCP 服务器实例。"""
+    # 延迟导入：只有用到该夹具的测试模块才加载 mcp
+    from linux_ssh_mcp.mcp_server import create_mcp_server
+    from linux_ssh_mcp.settings import SSHMCPSettings
+
+    return create_mcp_server(settings=SSHMCPSettings())
@@ -1,18 +1,9 @@
-from linux_ssh_mcp.auth_manager import AuthManager
-
-
-def test_auth_manager_store_and_get_password(monkeypatch):
-    store = {}
+import keyring
 
-    def set_password(service_name: str, key: str, password: str) -> None:
-        store[(service_name, key)] = password
-
-    def get_password(service_name: str, key: str):
-        return store.get((service_name, key))
+from linux_ssh_mcp.auth_manager import AuthManager
 
-    monkeypatch.setattr("keyring.set_password", set_password)
-    monkeypatch.setattr("keyring.get_password", get_password)
 
+def test_auth_manager_store_and_get_password(fake_keyring):
     auth = AuthManager(service_name="test")
     auth.store_credentials(host="1.2.3.4", username="root", password="secret")
     creds = auth.get_credentials(host="1.2.3.4", username="root")
@@ -21,18 +12,7 @@ def test_auth_manager_store_and_get_password(monkeypatch):
     assert creds.auth_mode == "password"
 
 
-def test_auth_manager_store_and_get_key_path(monkeypatch):
-    store = {}
-
-    def set_password(service_name: str, key: str, password: str) -> None:
-        store[(service_name, key)] = password
-
-    def get_password(service_name: str, key: str):
-        return store.get((service_name, key))
-
-    monkeypatch.setattr("keyring.set_password", set_password)
-    monkeypatch.setattr("keyring.get_password", get_password)
-
+def test_auth_manager_store_and_get_key_path(fake_keyring):
     auth = AuthManager(service_name="test")
     auth.store_credentials(host="1.2.3.4", username="root", private_key_path="/id_ed25519")
     creds = auth.get_credentials(host="1.2.3.4", username="root")
@@ -41,18 +21,7 @@ def test_auth_manager_store_and_get_key_path(monkeypatch):
     assert creds.auth_mode == "key"
 
 
-def test_auth_manager_mixed_mode(monkeypatch):
-    store = {}
-
-    def set_password(service_name: str, key: str, password: str) -> None:
-        store[(service_name, key)] = password
-
-    def get_password(service_name: str, key: str):
-        return store.get((service_name, key))
-
-    monkeypatch.setattr("keyring.set_password", set_password)
-    monkeypatch.setattr("keyring.get_password", get_password)
-
+def test_auth_manager_mixed_mode(fake_keyring):
     auth = AuthManager(service_name="test")
     auth.store_credentials(
         host="1.2.3.4",
@@ -62,3 +31,38 @@ def test_auth_manager_mixed_mode(monkeypatch):
     )
     creds = auth.get_credentials(host="1.2.3.4", username="root")
     assert creds.auth_mode == "mixed"
+
+
+def test_auth_manager_caches_keyring_lookups(fake_keyring, monkeypatch):
+    lookups = []
+    get_password = keyring.get_password
+
+    def counting_get_password(service_name: str, key: str):
+        lookups.append(key)
+        return get_password(service_name, key)
+
+    monkeypatch.setattr("keyring.get_password", counting_get_password)
+
+    now = 100.0
+    auth = AuthManager(service_name="test", cred_ttl_seconds=60, time_provider=lambda: now)
+    auth.store_credentials(host="1.2.3.4", username="root", password="secret")
+    auth.get_credentials(host="1.2.3.4", username="root")
+    auth.get_credentials(host="1.2.3.4", username="root")
+    assert len(lookups) == 2
+
+    auth.store_credentials(host="1.2.3.4", username="root", password="changed")
+    assert auth.get_credentials(host="1.2.3.4", username="root").password == "changed"
+    assert len(lookups) == 4
+
+    now = 200.0
+    auth.get_credentials(host="1.2.3.4", username="root")
+    assert len(lookups) == 6
+
+
+def test_auth_manager_does_not_cache_missing_credentials(fake_keyring):
+    auth = AuthManager(service_name="test", cred_ttl_seconds=60, time_provider=lambda: 0.0)
+    assert auth.get_credentials(host="1.2.3.4", username="root").auth_mode == "none"
+
+    # 进程外写入 keyring 的凭据无需等待缓存过期即可读到
+    keyring.set_password("test", "1.2.3.4|root|password", "secret")
+    assert auth.get_credentials(host="1.2.3.4", username="root").password == "secret"
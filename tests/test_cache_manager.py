@@ -1,25 +1,25 @@
-import pytest
-
 from linux_ssh_mcp.cache_manager import CacheManager
 from linux_ssh_mcp.settings import SSHMCPSettings
 
+NS = 1_000_000_000
+
 
-@pytest.mark.asyncio
 async def test_cache_manager_set_get_and_expire() -> None:
-    now = 100.0
+    now = 100 * NS
 
-    def time_provider() -> float:
+    def time_provider_ns() -> int:
         return now
 
-    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=128), time_provider=time_provider)
+    cache = CacheManager(
+        settings=SSHMCPSettings(cache_maxsize=128), time_provider_ns=time_provider_ns
+    )
     await cache.set("k", "v", ttl_seconds=10)
     assert await cache.get("k") == "v"
 
-    now = 111.0
+    now = 111 * NS
     assert await cache.get("k") is None
 
 
-@pytest.mark.asyncio
 async def test_cache_manager_lru_eviction() -> None:
     cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=2))
     await cache.set("a", 1)
@@ -31,7 +31,24 @@ async def test_cache_manager_lru_eviction() -> None:
     assert await cache.get("c") == 3
 
 
-@pytest.mark.asyncio
+async def test_cache_manager_evicts_expired_before_lru() -> None:
+    now = 100 * NS
+
+    def time_provider_ns() -> int:
+        return now
+
+    cache = CacheManager(
+        settings=SSHMCPSettings(cache_maxsize=2), time_provider_ns=time_provider_ns
+    )
+    await cache.set("old", 1, ttl_seconds=1000)
+    await cache.set("short", 2, ttl_seconds=5)
+
+    now = 110 * NS
+    await cache.set("new", 3, ttl_seconds=1000)
+    assert await cache.get("old") == 1
+    assert await cache.get("new") == 3
+
+
 async def test_cache_manager_clear_by_tag_and_category() -> None:
     cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=10))
     await cache.set("s1", "x", category="static", tags=["sys"]) 
@@ -45,6 +62,18 @@ async def test_cache_manager_clear_by_tag_and_category() -> None:
     assert await cache.get("d1") == "y"
 
 
+async def test_cache_manager_reverse_index_tracks_overwrite_and_eviction() -> None:
+    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=2))
+    await cache.set("a", 1, tags=["sys"])
+    await cache.set("a", 2, tags=["proc"])
+    await cache.set("b", 3, tags=["sys"])
+    await cache.set("c", 4, tags=["sys"])
+
+    assert await cache.clear(tag="proc") == 0
+    assert await cache.clear(tag="sys") == 2
+    assert await cache.clear(category="dynamic") == 0
+
+
 def test_cache_manager_should_cache_for_command() -> None:
     cache = CacheManager(settings=SSHMCPSettings())
     assert cache.should_cache_for_command("uname -a") is True
@@ -52,3 +81,35 @@ def test_cache_manager_should_cache_for_command() -> None:
     assert cache.should_cache_for_command("echo hi > /tmp/a") is False
     assert cache.should_cache_for_command("sed -i 's/a/b/' file") is False
 
+
+async def test_cache_manager_tinylfu_rejects_one_hit_wonders() -> None:
+    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=2))
+    await cache.set("hot1", 1)
+    await cache.set("hot2", 2)
+    for _ in range(3):
+        assert await cache.get("hot1") == 1
+        assert await cache.get("hot2") == 2
+
+    await cache.set("scan", 3)
+    assert await cache.get("scan") is None
+    assert await cache.get("hot1") == 1
+    assert await cache.get("hot2") == 2
+
+    for _ in range(5):
+        assert await cache.get("popular") is None
+    await cache.set("popular", 4)
+    assert await cache.get("popular") == 4
+    assert await cache.get("hot1") is None
+
+
+async def test_cache_manager_get_info_returns_most_recent_keys() -> None:
+    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=10))
+    for k in ("a", "b", "c", "d"):
+        await cache.set(k, k)
+    assert await cache.get("b") == "b"
+
+    info = await cache.get_info(head=2)
+    assert info.size == 4
+    assert info.keys == ["d", "b"]
+    assert (await cache.get_info(head=0)).keys == []
+    assert list(cache.iter_keys()) == ["a", "c", "d", "b"]
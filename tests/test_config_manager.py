@@ -31,3 +31,17 @@ def test_config_manager_uses_default_config_file_if_env_set(
 
     manager = ConfigManager.load()
     assert manager.settings.log_level == "WARNING"
+
+
+def test_config_manager_rereads_json_after_file_change(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("SSH_MCP_LOG_LEVEL", raising=False)
+    config_file = tmp_path / "c.json"
+    config_file.write_text(json.dumps({"log_level": "WARNING"}), encoding="utf-8")
+    assert ConfigManager.load(config_file=config_file).settings.log_level == "WARNING"
+    assert ConfigManager.load(config_file=config_file).settings.log_level == "WARNING"
+
+    config_file.write_text(json.dumps({"log_level": "DEBUG"}), encoding="utf-8")
+    assert ConfigManager.load(config_file=config_file).settings.log_level == "DEBUG"
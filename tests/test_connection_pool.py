@@ -1,6 +1,6 @@
 """ConnectionPool 连接池单元测试模块
 
-覆盖以下场景：
+覆盖以下场景（键与包装数据类见 test_connection_pool_dataclasses.py）：
 - 连接获取与复用
 - 并发控制（信号量限制）
 - 空闲连接清理（后台清理任务）
@@ -12,6 +12,9 @@
 - 连接超时与异常处理
 """
 import asyncio
+from collections.abc import AsyncIterator, Callable, Coroutine
+from contextlib import asynccontextmanager
+from typing import Any
 from unittest.mock import AsyncMock
 
 import pytest
@@ -22,7 +25,6 @@ from linux_ssh_mcp.connection_pool import (
     HostKey,
     LeasedConnection,
     PoolKey,
-    _PooledConnection,
 )
 from linux_ssh_mcp.exceptions import SSHConnectionError
 from linux_ssh_mcp.settings import SSHMCPSettings
@@ -36,6 +38,8 @@ class FakeConnection:
         closed_count: close() 被调用的次数
     """
 
+    __slots__ = ("closed", "closed_count")
+
     def __init__(self) -> None:
         self.closed = False
         self.closed_count = 0
@@ -58,110 +62,91 @@ class FakeConnection:
         return
 
 
-def _make_creds() -> SSHCredentials:
-    """创建测试用 SSH 凭据。
+@asynccontextmanager
+async def _task_group(*coros: Coroutine[Any, Any, None]) -> AsyncIterator[None]:
+    """兼容 Python 3.10 的简化 TaskGroup。
 
-    Returns:
-        SSHCredentials: 测试凭据对象
+    正常退出时等待全部任务完成；异常退出时取消并等待尚未完成的任务，
+    避免断言失败后遗留孤儿任务。
     """
-    return SSHCredentials(
-        host="1.2.3.4",
-        username="root",
-        password="p",
-        private_key_path=None,
-    )
+    tasks = [asyncio.create_task(c) for c in coros]
+    try:
+        yield
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
-class TestDataClasses:
-    """数据类测试组。"""
-
-    def test_host_key_frozen(self) -> None:
-        """HostKey 应为不可变对象。"""
-        hk = HostKey(host="10.0.0.1", port=22)
-        assert hk.host == "10.0.0.1"
-        assert hk.port == 22
-        with pytest.raises(AttributeError):
-            hk.host = "changed"  # type: ignore[misc]
-
-    def test_pool_key_frozen(self) -> None:
-        """PoolKey 应为不可变对象。"""
-        pk = PoolKey(host="10.0.0.1", port=22, username="root")
-        assert pk.host == "10.0.0.1"
-        assert pk.port == 22
-        assert pk.username == "root"
-        with pytest.raises(AttributeError):
-            pk.username = "changed"  # type: ignore[misc]
-
-    def test_host_key_equality(self) -> None:
-        """相同属性的 HostKey 应相等。"""
-        hk1 = HostKey(host="h", port=22)
-        hk2 = HostKey(host="h", port=22)
-        assert hk1 == hk2
-        assert hash(hk1) == hash(hk2)
-
-    def test_pool_key_equality(self) -> None:
-        """相同属性的 PoolKey 应相等。"""
-        pk1 = PoolKey(host="h", port=22, username="u")
-        pk2 = PoolKey(host="h", port=22, username="u")
-        assert pk1 == pk2
-        assert hash(pk1) == hash(pk2)
-
-    def test_different_host_keys_not_equal(self) -> None:
-        """不同属性的 HostKey 不应相等。"""
-        hk1 = HostKey(host="h1", port=22)
-        hk2 = HostKey(host="h2", port=22)
-        assert hk1 != hk2
-
-    def test_pooled_connection_attributes(self) -> None:
-        """_PooledConnection 应正确保存属性。"""
-        fake = FakeConnection()
-        pc = _PooledConnection(connection=fake, last_used_monotonic=100.0)
-        assert pc.connection is fake
-        assert pc.last_used_monotonic == 100.0
+@pytest.fixture(autouse=True)
+def patched_connect(mocker) -> AsyncMock:
+    """统一替换 asyncssh.connect，各测试通过 return_value/side_effect 指定连接行为。
+
+    不使用 autospec：连接池只以关键字参数调用 connect，
+    无需为每个测试构建 asyncssh 的完整签名规格。
+    """
+    return mocker.patch("asyncssh.connect", new_callable=AsyncMock)
+
+
+@pytest.fixture
+async def pool_factory() -> AsyncIterator[Callable[..., ConnectionPool]]:
+    """创建连接池的工厂，测试结束时关闭所有尚未关闭的连接池。"""
+    pools: list[ConnectionPool] = []
+
+    def make(**kwargs) -> ConnectionPool:
+        pool = ConnectionPool(**kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        if not pool._closed:
+            await pool.close_all()
+
+
+@pytest.fixture(scope="session")
+def default_settings() -> SSHMCPSettings:
+    """整个测试会话共享的默认配置，变体通过 model_copy 派生以跳过重复校验。"""
+    return SSHMCPSettings(per_host_max_connections=5)
 
 
 class TestConnectionReuse:
     """连接复用测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_reuses_connection_after_checkin(self, mocker) -> None:
+    async def test_reuses_connection_after_checkin(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """归还的连接应被下次 acquire 复用。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        connect = mocker.patch(
-            "asyncssh.connect", side_effect=connect_side_effect, autospec=True
-        )
+        patched_connect.return_value = fake
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c1:
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c1:
             assert c1 is fake
 
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c2:
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c2:
             assert c2 is fake
 
-        assert connect.call_count == 1
-        await pool.close_all()
+        assert patched_connect.call_count == 1
 
-    @pytest.mark.asyncio
-    async def test_different_users_get_different_connections(self, mocker) -> None:
+    async def test_different_users_get_different_connections(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+    ) -> None:
         """不同用户应获取不同的连接（PoolKey 不同）。"""
         fakes = [FakeConnection(), FakeConnection()]
-        call_count = 0
+        patched_connect.side_effect = fakes
 
-        async def connect_side_effect(**_kwargs):
-            nonlocal call_count
-            idx = call_count
-            call_count += 1
-            return fakes[idx]
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
+        pool = pool_factory(settings=default_settings)
         creds_a = SSHCredentials(host="1.2.3.4", username="alice", password="p", private_key_path=None)
         creds_b = SSHCredentials(host="1.2.3.4", username="bob", password="p", private_key_path=None)
 
@@ -171,15 +156,19 @@ class TestConnectionReuse:
             pass
 
         assert ca is not cb
-        assert call_count == 2
-        await pool.close_all()
+        assert patched_connect.call_count == 2
 
 
 class TestConcurrencyControl:
     """并发控制（信号量）测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_limits_concurrent_connections_per_host(self, mocker) -> None:
+    async def test_limits_concurrent_connections_per_host(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """应限制每主机的最大并发连接数。"""
         created: list[FakeConnection] = []
 
@@ -188,70 +177,78 @@ class TestConcurrencyControl:
             created.append(c)
             return c
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.side_effect = connect_side_effect
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=2))
-        creds = _make_creds()
+        pool = pool_factory(
+            settings=default_settings.model_copy(update={"per_host_max_connections": 2})
+        )
 
         entered: list[int] = []
+        limit_reached = asyncio.Event()
         release = asyncio.Event()
 
         async def worker(i: int) -> None:
-            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
                 entered.append(i)
+                if len(entered) == 2:
+                    limit_reached.set()
                 await release.wait()
 
-        tasks = [asyncio.create_task(worker(i)) for i in range(3)]
-        try:
-            await asyncio.sleep(0.05)
+        async with _task_group(*(worker(i) for i in range(3))):
+            await asyncio.wait_for(limit_reached.wait(), timeout=1)
+            # 让出几轮事件循环，确认第三个worker确实阻塞在信号量上而非尚未调度
+            for _ in range(3):
+                await asyncio.sleep(0)
             assert len(entered) == 2, f"应只有2个worker进入，实际: {len(entered)}"
             release.set()
-            await asyncio.gather(*tasks)
-            assert len(entered) == 3
-        finally:
-            for t in tasks:
-                t.cancel()
-            await pool.close_all()
-
-    @pytest.mark.asyncio
-    async def test_different_hosts_have_independent_semaphores(self, mocker) -> None:
+        assert len(entered) == 3
+
+    async def test_different_hosts_have_independent_semaphores(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+    ) -> None:
         """不同主机的信号量应互相独立。"""
         async def connect_side_effect(**_kwargs):
             return FakeConnection()
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.side_effect = connect_side_effect
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=1))
+        pool = pool_factory(
+            settings=default_settings.model_copy(update={"per_host_max_connections": 1})
+        )
         creds_h1 = SSHCredentials(host="10.0.0.1", username="root", password="p", private_key_path=None)
         creds_h2 = SSHCredentials(host="10.0.0.2", username="root", password="p", private_key_path=None)
 
         entered: list[str] = []
+        both_entered = asyncio.Event()
         release = asyncio.Event()
 
-        async def worker(host: str, creds: SSHCredentials) -> None:
-            async with pool.acquire_connection(host=host, port=22, credentials=creds):
+        async def worker(host: str, host_creds: SSHCredentials) -> None:
+            async with pool.acquire_connection(host=host, port=22, credentials=host_creds):
                 entered.append(host)
+                if len(entered) == 2:
+                    both_entered.set()
                 await release.wait()
 
-        t1 = asyncio.create_task(worker("10.0.0.1", creds_h1))
-        t2 = asyncio.create_task(worker("10.0.0.2", creds_h2))
-        try:
-            await asyncio.sleep(0.05)
+        async with _task_group(worker("10.0.0.1", creds_h1), worker("10.0.0.2", creds_h2)):
+            await asyncio.wait_for(both_entered.wait(), timeout=1)
             # 两个不同主机应各自独立进入，不互相阻塞
             assert len(entered) == 2
             release.set()
-            await asyncio.gather(t1, t2)
-        finally:
-            t1.cancel()
-            t2.cancel()
-            await pool.close_all()
 
 
 class TestIdleConnectionCleanup:
     """空闲连接清理测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_idle_connection_cleaned_via_background_cleanup(self, mocker) -> None:
+    async def test_idle_connection_cleaned_via_background_cleanup(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """超过 TTL 的空闲连接应被后台清理任务清理，下次 acquire 创建新连接。"""
         fake = FakeConnection()
         fakes = [fake]
@@ -259,27 +256,37 @@ class TestIdleConnectionCleanup:
         async def connect_side_effect(**_kwargs):
             return fakes[-1]
 
-        connect = mocker.patch(
-            "asyncssh.connect", side_effect=connect_side_effect, autospec=True
-        )
+        patched_connect.side_effect = connect_side_effect
+
+        # 由测试逐次放行后台循环的 sleep，不等待真实的清理间隔
+        ticks: asyncio.Queue[None] = asyncio.Queue()
+        sleeping = asyncio.Event()
+
+        async def fake_sleep(_delay: float) -> None:
+            sleeping.set()
+            await ticks.get()
 
         now = 100.0
 
         def time_provider() -> float:
             return now
 
-        pool = ConnectionPool(
-            settings=SSHMCPSettings(per_host_max_connections=5, idle_connection_ttl_seconds=10),
+        pool = pool_factory(
+            settings=default_settings.model_copy(update={"idle_connection_ttl_seconds": 10}),
             time_provider=time_provider,
+            sleep=fake_sleep,
         )
-        creds = _make_creds()
 
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
-        # 模拟时间超过 TTL，手动触发清理
+        await sleeping.wait()
+        sleeping.clear()
+
+        # 模拟时间超过 TTL，放行一次后台清理，待其再次进入 sleep 即完成
         now = 200.0
-        await pool._cleanup_all_idle()
+        ticks.put_nowait(None)
+        await sleeping.wait()
 
         # 过期连接应被清理关闭
         assert fake.closed is True
@@ -287,152 +294,95 @@ class TestIdleConnectionCleanup:
         # 下次 acquire 应创建新连接
         fake2 = FakeConnection()
         fakes.append(fake2)
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c2:
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c2:
             assert c2 is fake2
 
-        assert connect.call_count == 2
-        await pool.close_all()
-
-    @pytest.mark.asyncio
-    async def test_cleanup_all_idle_removes_expired(self, mocker) -> None:
-        """_cleanup_all_idle 应移除超过 TTL 的连接。"""
-        fake = FakeConnection()
-
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        now = 100.0
-
-        def time_provider() -> float:
-            return now
-
-        pool = ConnectionPool(
-            settings=SSHMCPSettings(per_host_max_connections=5, idle_connection_ttl_seconds=10),
-            time_provider=time_provider,
-        )
-        creds = _make_creds()
-
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
-            pass
-
-        # 模拟时间前进超过 TTL
-        now = 200.0
-        await pool._cleanup_all_idle()
-
-        # 连接应被清理关闭
-        assert fake.closed is True
-        # 内部池应为空
-        assert len(pool._connections) == 0
-        await pool.close_all()
-
-    @pytest.mark.asyncio
-    async def test_cleanup_keeps_fresh_connections(self, mocker) -> None:
-        """_cleanup_all_idle 应保留未过期的连接。"""
-        fake = FakeConnection()
-
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        now = 100.0
-
-        def time_provider() -> float:
-            return now
-
-        pool = ConnectionPool(
-            settings=SSHMCPSettings(per_host_max_connections=5, idle_connection_ttl_seconds=300),
-            time_provider=time_provider,
-        )
-        creds = _make_creds()
-
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
-            pass
-
-        # 时间仅前进 5 秒，远低于 300 秒的 TTL
-        now = 105.0
-        await pool._cleanup_all_idle()
-
-        # 连接应仍在池中
-        assert fake.closed is False
-        assert len(pool._connections) > 0
-        await pool.close_all()
+        assert patched_connect.call_count == 2
 
-    @pytest.mark.asyncio
-    async def test_cleanup_removes_dead_connections(self, mocker) -> None:
-        """_cleanup_all_idle 应移除已死连接（即使未过期）。"""
+    @pytest.mark.parametrize(
+        ("ttl", "advance", "force_dead", "expect_closed"),
+        [
+            pytest.param(10, 100.0, False, True, id="expired"),
+            pytest.param(300, 5.0, False, False, id="fresh"),
+            pytest.param(300, 0.0, True, True, id="dead"),
+        ],
+    )
+    async def test_cleanup_all_idle(
+        self,
+        patched_connect,
+        pool_factory,
+        ttl: int,
+        advance: float,
+        force_dead: bool,
+        expect_closed: bool,
+        default_settings,
+        creds_pw,
+    ) -> None:
+        """_cleanup_all_idle 应移除超过 TTL 或已死的连接，保留未过期的连接。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        now = 100.0
-
-        def time_provider() -> float:
-            return now
+        patched_connect.return_value = fake
 
-        pool = ConnectionPool(
-            settings=SSHMCPSettings(per_host_max_connections=5, idle_connection_ttl_seconds=300),
-            time_provider=time_provider,
+        clock = [100.0]
+        pool = pool_factory(
+            settings=default_settings.model_copy(update={"idle_connection_ttl_seconds": ttl}),
+            time_provider=lambda: clock[0],
         )
-        creds = _make_creds()
 
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
-        # 标记连接为死亡状态
-        fake.closed = True
+        clock[0] += advance
+        if force_dead:
+            fake.closed = True
         await pool._cleanup_all_idle()
 
-        # 死连接应被从池中移除
-        assert len(pool._connections) == 0
-        await pool.close_all()
+        assert fake.closed is expect_closed
+        # 被清理的连接应从内部池中移除，保留的连接仍在池中
+        assert (len(pool._connections) == 0) is expect_closed
 
 
 class TestBackgroundCleanupTask:
     """后台清理任务测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_cleanup_task_starts_lazily(self, mocker) -> None:
+    async def test_cleanup_task_starts_lazily(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """后台清理任务应在首次 acquire 时懒启动。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.return_value = fake
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
+        pool = pool_factory(settings=default_settings)
         # 初始时不应有清理任务
         assert pool._cleanup_task is None
 
-        creds = _make_creds()
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
         # acquire 后清理任务应已启动
         assert pool._cleanup_task is not None
         assert not pool._cleanup_task.done()
-        await pool.close_all()
 
-    @pytest.mark.asyncio
-    async def test_cleanup_task_stops_on_close_all(self, mocker) -> None:
+    async def test_cleanup_task_stops_on_close_all(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """close_all 应停止后台清理任务。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
+        patched_connect.return_value = fake
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        pool = pool_factory(settings=default_settings)
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
-
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
         assert pool._cleanup_task is not None
@@ -444,40 +394,33 @@ class TestBackgroundCleanupTask:
 class TestDeadConnectionDetection:
     """死连接检测测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_dead_connection_skipped_on_checkout(self, mocker) -> None:
+    async def test_dead_connection_skipped_on_checkout(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """checkout 时应跳过已死连接并创建新连接。"""
         dead = FakeConnection()
         dead.closed = True
         alive = FakeConnection()
 
-        call_count = 0
-
-        async def connect_side_effect(**_kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return dead
-            return alive
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.side_effect = [dead, alive]
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
         # 第一次获取死连接
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c1:
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c1:
             assert c1 is dead
 
         # 手动标记为死亡（模拟归还后连接死亡）
         dead.closed = True
 
         # 第二次应跳过死连接，创建新连接
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c2:
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c2:
             assert c2 is alive
 
-        await pool.close_all()
-
     def test_is_connection_dead_healthy(self) -> None:
         """健康连接应返回 False。"""
         fake = FakeConnection()
@@ -493,61 +436,66 @@ class TestDeadConnectionDetection:
 class TestRequestCoalescing:
     """请求合并测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_concurrent_requests_coalesce(self, mocker) -> None:
+    async def test_concurrent_requests_coalesce(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """并发请求同一主机时应触发请求合并，减少总连接创建数。"""
         connect_calls = 0
-        connect_event = asyncio.Event()
+        first_connect_started = asyncio.Event()
+        first_connect_gate = asyncio.Event()
 
         async def connect_side_effect(**_kwargs):
             nonlocal connect_calls
             connect_calls += 1
-            # 第一次连接模拟延迟
+            # 第一次连接挂起，直到其余请求都已发起
             if connect_calls == 1:
-                await asyncio.sleep(0.05)
+                first_connect_started.set()
+                await first_connect_gate.wait()
             return FakeConnection()
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.side_effect = connect_side_effect
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
         results: list[object] = []
 
         async def worker() -> None:
-            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c:
+            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c:
                 results.append(c)
 
         # 同时发起 3 个请求
-        tasks = [asyncio.create_task(worker()) for _ in range(3)]
-        await asyncio.gather(*tasks)
+        async with _task_group(*(worker() for _ in range(3))):
+            await first_connect_started.wait()
+            first_connect_gate.set()
 
         # 请求合并后，连接创建次数应少于请求数
         # 至少第一个请求和后续等待者的连接总数不超过请求数
         assert connect_calls <= 3
         assert len(results) == 3
-        await pool.close_all()
 
 
 class TestLeasedConnection:
     """LeasedConnection 手动释放模式测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_lease_and_release(self, mocker) -> None:
+    async def test_lease_and_release(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """lease_connection 应返回 LeasedConnection，release 后连接归还池中。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
+        patched_connect.return_value = fake
 
-        connect = mocker.patch(
-            "asyncssh.connect", side_effect=connect_side_effect, autospec=True
-        )
+        pool = pool_factory(settings=default_settings)
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
-
-        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds)
+        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds_pw)
         assert isinstance(leased, LeasedConnection)
         assert leased.connection is fake
 
@@ -555,53 +503,57 @@ class TestLeasedConnection:
         await leased.release()
 
         # 再次获取应复用
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds) as c:
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw) as c:
             assert c is fake
 
-        assert connect.call_count == 1
-        await pool.close_all()
+        assert patched_connect.call_count == 1
 
-    @pytest.mark.asyncio
-    async def test_lease_release_with_close(self, mocker) -> None:
+    async def test_lease_release_with_close(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """release(close=True) 应关闭连接而非归还到池中。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.return_value = fake
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
-        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds)
+        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds_pw)
         await leased.release(close=True)
 
         assert fake.closed is True
-        await pool.close_all()
 
-    @pytest.mark.asyncio
-    async def test_double_release_is_safe(self, mocker) -> None:
+    async def test_double_release_is_safe(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """重复调用 release() 应安全无操作。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.return_value = fake
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
-        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds)
+        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds_pw)
         await leased.release()
         await leased.release()  # 第二次调用不应抛异常
 
         assert leased._released is True
-        await pool.close_all()
 
-    @pytest.mark.asyncio
-    async def test_lease_releases_semaphore_on_connect_failure(self, mocker) -> None:
+    async def test_lease_releases_semaphore_on_connect_failure(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """lease_connection 连接失败时应释放信号量。"""
         fake2 = FakeConnection()
         call_count = 0
@@ -613,39 +565,35 @@ class TestLeasedConnection:
                 raise OSError("Connection refused")
             return fake2
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.side_effect = connect_side_effect
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=1))
-        creds = _make_creds()
+        pool = pool_factory(
+            settings=default_settings.model_copy(update={"per_host_max_connections": 1})
+        )
 
         with pytest.raises(SSHConnectionError):
-            await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds)
+            await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds_pw)
 
         # 信号量应已释放，第二次请求不应被阻塞
-        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds)
+        leased = await pool.lease_connection(host="1.2.3.4", port=22, credentials=creds_pw)
         assert leased.connection is fake2
         await leased.release()
-        await pool.close_all()
 
 
 class TestCloseAll:
     """close_all 全量清理测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_close_all_cleans_all_connections(self, mocker) -> None:
+    async def test_close_all_cleans_all_connections(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+    ) -> None:
         """close_all 应关闭所有池化连接。"""
         fakes = [FakeConnection(), FakeConnection()]
-        call_idx = 0
-
-        async def connect_side_effect(**_kwargs):
-            nonlocal call_idx
-            idx = call_idx
-            call_idx += 1
-            return fakes[idx]
+        patched_connect.side_effect = fakes
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
+        pool = pool_factory(settings=default_settings)
         creds_a = SSHCredentials(host="10.0.0.1", username="root", password="p", private_key_path=None)
         creds_b = SSHCredentials(host="10.0.0.2", username="root", password="p", private_key_path=None)
 
@@ -662,20 +610,21 @@ class TestCloseAll:
         assert len(pool._connections) == 0
         assert len(pool._host_index) == 0
 
-    @pytest.mark.asyncio
-    async def test_close_all_idempotent(self, mocker) -> None:
+    async def test_close_all_idempotent(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """多次调用 close_all 应安全无异常。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
+        patched_connect.return_value = fake
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        pool = pool_factory(settings=default_settings)
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
-
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
         await pool.close_all()
@@ -686,81 +635,83 @@ class TestCloseAll:
 class TestConnectionErrors:
     """连接异常处理测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_connection_failure_raises_ssh_error(self, mocker) -> None:
+    async def test_connection_failure_raises_ssh_error(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """SSH 连接失败应抛出 SSHConnectionError。"""
-        async def connect_side_effect(**_kwargs):
-            raise OSError("Connection refused")
+        patched_connect.side_effect = OSError("Connection refused")
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
         with pytest.raises(SSHConnectionError, match="SSH连接失败"):
-            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
                 pass
 
-        await pool.close_all()
-
-    @pytest.mark.asyncio
-    async def test_connection_timeout_raises_ssh_error(self, mocker) -> None:
+    async def test_connection_timeout_raises_ssh_error(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """SSH 连接超时应抛出 SSHConnectionError。"""
         async def connect_side_effect(**_kwargs):
-            await asyncio.sleep(10)  # 模拟长时间等待
+            await asyncio.Future()  # 永不完成，由连接池的超时取消
             return FakeConnection()
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.side_effect = connect_side_effect
 
-        pool = ConnectionPool(
-            settings=SSHMCPSettings(per_host_max_connections=5),
+        pool = pool_factory(
+            settings=default_settings,
             connect_timeout_seconds=0,  # 立即超时
         )
-        creds = _make_creds()
 
         with pytest.raises(SSHConnectionError, match="SSH连接超时"):
-            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+            async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
                 pass
 
-        await pool.close_all()
-
-    @pytest.mark.asyncio
-    async def test_error_details_contain_host_and_port(self, mocker) -> None:
+    async def test_error_details_contain_host_and_port(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """SSHConnectionError 应包含 host 和 port 信息。"""
-        async def connect_side_effect(**_kwargs):
-            raise OSError("Connection refused")
+        patched_connect.side_effect = OSError("Connection refused")
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
+        pool = pool_factory(settings=default_settings)
 
         with pytest.raises(SSHConnectionError) as exc_info:
-            async with pool.acquire_connection(host="1.2.3.4", port=2222, credentials=creds):
+            async with pool.acquire_connection(host="1.2.3.4", port=2222, credentials=creds_pw):
                 pass
 
         assert exc_info.value.host == "1.2.3.4"
         assert exc_info.value.port == 2222
-        await pool.close_all()
 
 
 class TestHostKeyIndex:
     """HostKey 索引维护测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_host_index_populated_on_checkin(self, mocker) -> None:
+    async def test_host_index_populated_on_checkin(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """连接归还时应维护 HostKey -> Set[PoolKey] 索引。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
+        patched_connect.return_value = fake
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        pool = pool_factory(settings=default_settings)
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
-        creds = _make_creds()
-
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
         # 连接归还后索引应有记录
@@ -768,30 +719,30 @@ class TestHostKeyIndex:
         assert host_key in pool._host_index
         pool_key = PoolKey(host="1.2.3.4", port=22, username="root")
         assert pool_key in pool._host_index[host_key]
-        await pool.close_all()
 
-    @pytest.mark.asyncio
-    async def test_host_index_cleaned_on_empty_pool(self, mocker) -> None:
+    async def test_host_index_cleaned_on_empty_pool(
+        self,
+        patched_connect,
+        pool_factory,
+        default_settings,
+        creds_pw,
+    ) -> None:
         """当 PoolKey 下无连接时，索引应被清理。"""
         fake = FakeConnection()
 
-        async def connect_side_effect(**_kwargs):
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.return_value = fake
 
         now = 100.0
 
         def time_provider() -> float:
             return now
 
-        pool = ConnectionPool(
-            settings=SSHMCPSettings(per_host_max_connections=5, idle_connection_ttl_seconds=10),
+        pool = pool_factory(
+            settings=default_settings.model_copy(update={"idle_connection_ttl_seconds": 10}),
             time_provider=time_provider,
         )
-        creds = _make_creds()
 
-        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
+        async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds_pw):
             pass
 
         # 时间前进超过 TTL
@@ -801,47 +752,32 @@ class TestHostKeyIndex:
         # 索引应被清理
         host_key = HostKey(host="1.2.3.4", port=22)
         assert host_key not in pool._host_index
-        await pool.close_all()
 
 
 class TestConnectionCredentials:
     """连接凭据处理测试组。"""
 
-    @pytest.mark.asyncio
-    async def test_password_auth(self, mocker) -> None:
+    async def test_password_auth(self, patched_connect, pool_factory, default_settings) -> None:
         """密码认证应传递 password 参数。"""
         fake = FakeConnection()
-        connect_kwargs = {}
+        patched_connect.return_value = fake
 
-        async def connect_side_effect(**kwargs):
-            connect_kwargs.update(kwargs)
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
+        pool = pool_factory(settings=default_settings)
         creds = SSHCredentials(host="1.2.3.4", username="root", password="secret", private_key_path=None)
 
         async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
             pass
 
+        connect_kwargs = patched_connect.call_args.kwargs
         assert connect_kwargs["password"] == "secret"
         assert "client_keys" not in connect_kwargs
-        await pool.close_all()
 
-    @pytest.mark.asyncio
-    async def test_key_auth(self, mocker) -> None:
+    async def test_key_auth(self, patched_connect, pool_factory, default_settings) -> None:
         """密钥认证应传递 client_keys 参数。"""
         fake = FakeConnection()
-        connect_kwargs = {}
-
-        async def connect_side_effect(**kwargs):
-            connect_kwargs.update(kwargs)
-            return fake
-
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
+        patched_connect.return_value = fake
 
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
+        pool = pool_factory(settings=default_settings)
         creds = SSHCredentials(
             host="1.2.3.4", username="root", password=None, private_key_path="/home/user/.ssh/id_rsa"
         )
@@ -849,23 +785,16 @@ class TestConnectionCredentials:
         async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
             pass
 
+        connect_kwargs = patched_connect.call_args.kwargs
         assert connect_kwargs["client_keys"] == ["/home/user/.ssh/id_rsa"]
         assert "password" not in connect_kwargs
-        await pool.close_all()
 
-    @pytest.mark.asyncio
-    async def test_mixed_auth(self, mocker) -> None:
+    async def test_mixed_auth(self, patched_connect, pool_factory, default_settings) -> None:
         """同时提供密码和密钥时应两者都传递。"""
         fake = FakeConnection()
-        connect_kwargs = {}
-
-        async def connect_side_effect(**kwargs):
-            connect_kwargs.update(kwargs)
-            return fake
+        patched_connect.return_value = fake
 
-        mocker.patch("asyncssh.connect", side_effect=connect_side_effect, autospec=True)
-
-        pool = ConnectionPool(settings=SSHMCPSettings(per_host_max_connections=5))
+        pool = pool_factory(settings=default_settings)
         creds = SSHCredentials(
             host="1.2.3.4",
             username="root",
@@ -876,6 +805,6 @@ class TestConnectionCredentials:
         async with pool.acquire_connection(host="1.2.3.4", port=22, credentials=creds):
             pass
 
+        connect_kwargs = patched_connect.call_args.kwargs
         assert connect_kwargs["password"] == "secret"
         assert connect_kwargs["client_keys"] == ["/home/user/.ssh/id_rsa"]
-        await pool.close_all()
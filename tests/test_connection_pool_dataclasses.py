@@ -0,0 +1,56 @@
+"""ConnectionPool 数据类单元测试模块
+
+HostKey / PoolKey / _PooledConnection 均为纯同步数据类，
+单独成文件，不引入 asyncio 及连接池测试的异步夹具。
+"""
+import pytest
+
+from linux_ssh_mcp.connection_pool import HostKey, PoolKey, _PooledConnection
+
+
+class TestDataClasses:
+    """数据类测试组。"""
+
+    def test_host_key_frozen(self) -> None:
+        """HostKey 应为不可变对象。"""
+        hk = HostKey(host="10.0.0.1", port=22)
+        assert hk.host == "10.0.0.1"
+        assert hk.port == 22
+        with pytest.raises(AttributeError):
+            hk.host = "changed"  # type: ignore[misc]
+
+    def test_pool_key_frozen(self) -> None:
+        """PoolKey 应为不可变对象。"""
+        pk = PoolKey(host="10.0.0.1", port=22, username="root")
+        assert pk.host == "10.0.0.1"
+        assert pk.port == 22
+        assert pk.username == "root"
+        with pytest.raises(AttributeError):
+            pk.username = "changed"  # type: ignore[misc]
+
+    def test_host_key_equality(self) -> None:
+        """相同属性的 HostKey 应相等。"""
+        hk1 = HostKey(host="h", port=22)
+        hk2 = HostKey(host="h", port=22)
+        assert hk1 == hk2
+        assert hash(hk1) == hash(hk2)
+
+    def test_pool_key_equality(self) -> None:
+        """相同属性的 PoolKey 应相等。"""
+        pk1 = PoolKey(host="h", port=22, username="u")
+        pk2 = PoolKey(host="h", port=22, username="u")
+        assert pk1 == pk2
+        assert hash(pk1) == hash(pk2)
+
+    def test_different_host_keys_not_equal(self) -> None:
+        """不同属性的 HostKey 不应相等。"""
+        hk1 = HostKey(host="h1", port=22)
+        hk2 = HostKey(host="h2", port=22)
+        assert hk1 != hk2
+
+    def test_pooled_connection_attributes(self) -> None:
+        """_PooledConnection 应正确保存属性。"""
+        conn = object()
+        pc = _PooledConnection(connection=conn, last_used_monotonic=100.0)  # type: ignore[arg-type]
+        assert pc.connection is conn
+        assert pc.last_used_monotonic == 100.0
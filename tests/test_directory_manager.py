@@ -1,6 +1,5 @@
 import asyncio
-
-import pytest
+from collections import deque
 
 from linux_ssh_mcp.auth_manager import SSHCredentials
 from linux_ssh_mcp.directory_manager import DirectoryManager
@@ -19,17 +18,35 @@ class _FakeStdin:
 
 
 class _FakeStream:
+    """单生产者/单消费者的假输出流：deque 缓冲，读取方在空时挂起一个 Future 等待。"""
+
     def __init__(self) -> None:
-        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._buf: deque[str] = deque()
+        self._waiter: asyncio.Future[None] | None = None
+        self._closed = False
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
 
     def push(self, data: str) -> None:
-        self._queue.put_nowait(data)
+        self._buf.append(data)
+        self._wake()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake()
 
     async def read(self, _n: int) -> str:
-        if self._queue.empty():
-            await asyncio.sleep(0)
-            return ""
-        return await self._queue.get()
+        while not self._buf:
+            if self._closed:
+                return ""
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._buf.popleft()
 
 
 class _FakeProcess:
@@ -37,26 +54,27 @@ class _FakeProcess:
         self.stdin = _FakeStdin(self)
         self.stdout = _FakeStream()
         self.stderr = _FakeStream()
+        self.stderr.close()
         self._terminated = False
 
     def on_input(self, data: str) -> None:
-        m = None
-        for line in data.splitlines():
-            if line.startswith("echo __MCP_DONE_"):
-                m = line.split("echo ", 1)[1]
-        if m is None:
+        # 直接定位最后一个结束标记，不逐行扫描整段输入
+        _, sep, tail = data.rpartition("echo __MCP_DONE_")
+        if not sep:
             return
-        marker = m.split("$?", 1)[0]
+        marker = "__MCP_DONE_" + tail.split("$?", 1)[0]
         self.stdout.push("out\n")
         self.stdout.push(f"{marker}0{marker}")
 
     def terminate(self) -> None:
         self._terminated = True
+        self.stdout.close()
 
 
 class _FakeSFTP:
     def __init__(self, names: list[str]) -> None:
-        self._names = names
+        # 只构造一次不可变序列，listdir 直接返回，无需每次复制
+        self._names = tuple(names)
 
     async def __aenter__(self):
         return self
@@ -65,7 +83,7 @@ class _FakeSFTP:
         return False
 
     async def listdir(self, _path: str):
-        return list(self._names)
+        return self._names
 
 
 class _FakeConn:
@@ -79,43 +97,10 @@ class _FakeConn:
         return _FakeProcess()
 
 
-class _FakeLeased:
-    def __init__(self, conn: _FakeConn) -> None:
-        self.connection = conn
-        self.released = False
-        self.closed = False
-
-    async def release(self, *, close: bool = False) -> None:
-        self.released = True
-        self.closed = close
-
-
-class _FakePool:
-    def __init__(self, conn: _FakeConn) -> None:
-        self._conn = conn
-        self.leased: _FakeLeased | None = None
-
-    def acquire_connection(self, *, host: str, port: int, credentials: SSHCredentials):
-        class _CM:
-            async def __aenter__(_self):
-                return self._conn
-
-            async def __aexit__(_self, exc_type, exc, tb):
-                return False
-
-        return _CM()
-
-    async def lease_connection(self, *, host: str, port: int, credentials: SSHCredentials):
-        self.leased = _FakeLeased(self._conn)
-        return self.leased
-
-
-@pytest.mark.asyncio
-async def test_list_directory_paging_and_filter() -> None:
+async def test_list_directory_paging_and_filter(make_fake_pool, creds: SSHCredentials) -> None:
     conn = _FakeConn(["a.txt", "b.log", "c.txt", "d.txt"])
-    pool = _FakePool(conn)
+    pool = make_fake_pool(conn)
     mgr = DirectoryManager(settings=SSHMCPSettings(), pool=pool)  # type: ignore[arg-type]
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
 
     res = await mgr.list_directory(
         host="1.2.3.4",
@@ -130,12 +115,12 @@ async def test_list_directory_paging_and_filter() -> None:
     assert res["items"] == ["a.txt", "c.txt"]
 
 
-@pytest.mark.asyncio
-async def test_execute_interactive_reuses_session_and_can_close() -> None:
+async def test_execute_interactive_reuses_session_and_can_close(
+    make_fake_pool, creds: SSHCredentials
+) -> None:
     conn = _FakeConn([])
-    pool = _FakePool(conn)
+    pool = make_fake_pool(conn)
     mgr = DirectoryManager(settings=SSHMCPSettings(command_timeout_seconds=30), pool=pool)  # type: ignore[arg-type]
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
 
     r1 = await mgr.execute_interactive(
         host="1.2.3.4",
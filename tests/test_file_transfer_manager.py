@@ -1,4 +1,5 @@
 import hashlib
+import io
 import re
 from pathlib import Path
 
@@ -17,15 +18,25 @@ class _FakeAttrs:
         self.atime = 0
 
 
+class _Blob(io.BytesIO):
+    """远端文件内容，附带惰性计算的 MD5，写入时失效。"""
+
+    md5: str | None = None
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self.md5 = None
+        return super().write(data)
+
+
 class _FakeRemoteFile:
-    def __init__(self, store: dict[str, bytearray], path: str, mode: str) -> None:
+    def __init__(self, store: dict[str, _Blob], path: str, mode: str) -> None:
         self._store = store
         self._path = path
         self._mode = mode
         if "w" in mode:
-            self._store[path] = bytearray()
+            self._store[path] = _Blob()
         if "a" in mode and path not in self._store:
-            self._store[path] = bytearray()
+            self._store[path] = _Blob()
         self._pos = 0
 
     async def __aenter__(self):
@@ -36,13 +47,14 @@ class _FakeRemoteFile:
 
     async def write(self, data: bytes) -> None:
         buf = self._store[self._path]
-        buf.extend(data)
+        buf.seek(0, io.SEEK_END)
+        buf.write(data)
 
     async def read(self, n: int) -> bytes:
-        buf = bytes(self._store[self._path])
-        if self._pos >= len(buf):
-            return b""
-        chunk = buf[self._pos : self._pos + n]
+        # 只读取所需的块，不再每次复制整个文件内容
+        buf = self._store[self._path]
+        buf.seek(self._pos)
+        chunk = buf.read(n)
         self._pos += len(chunk)
         return chunk
 
@@ -51,7 +63,7 @@ class _FakeRemoteFile:
 
 
 class _FakeSFTP:
-    def __init__(self, store: dict[str, bytearray]) -> None:
+    def __init__(self, store: dict[str, _Blob]) -> None:
         self._store = store
 
     async def __aenter__(self):
@@ -63,22 +75,16 @@ class _FakeSFTP:
     async def stat(self, path: str):
         if path not in self._store:
             raise FileNotFoundError(path)
-        return _FakeAttrs(size=len(self._store[path]))
+        return _FakeAttrs(size=self._store[path].seek(0, io.SEEK_END))
 
     def open(self, path: str, mode: str):
         return _FakeRemoteFile(self._store, path, mode)
 
 
-class _FakeCompleted:
-    def __init__(self, stdout: str, exit_status: int = 0) -> None:
-        self.stdout = stdout
-        self.stderr = ""
-        self.exit_status = exit_status
-
-
 class _FakeConn:
-    def __init__(self, store: dict[str, bytearray]) -> None:
+    def __init__(self, store: dict[str, _Blob], completed) -> None:
         self._store = store
+        self._completed = completed
 
     def start_sftp_client(self):
         return _FakeSFTP(self._store)
@@ -90,37 +96,49 @@ class _FakeConn:
                 path = m.group(2)
             else:
                 path = next((p for p in command.split() if p.startswith("/")), "")
-            data = bytes(self._store.get(path, b""))
-            h = hashlib.md5(data).hexdigest()
-            return _FakeCompleted(stdout=f"{h}  {path}\n")
-        return _FakeCompleted(stdout="")
+            blob = self._store.get(path)
+            if blob is None:
+                h = hashlib.md5(b"").hexdigest()
+            else:
+                if blob.md5 is None:
+                    # getbuffer() 直接暴露底层内存，避免复制整个文件
+                    with blob.getbuffer() as view:
+                        blob.md5 = hashlib.md5(view).hexdigest()
+                h = blob.md5
+            return self._completed(stdout=f"{h}  {path}\n")
+        return self._completed(stdout="")
+
 
+_SETTINGS = SSHMCPSettings(command_timeout_seconds=30)
 
-class _FakePool:
-    def __init__(self, conn: _FakeConn) -> None:
-        self._conn = conn
 
-    def acquire_connection(self, *, host: str, port: int, credentials: SSHCredentials):
-        class _CM:
-            async def __aenter__(_self):
-                return self._conn
+@pytest.fixture
+def ftm_with_store(fake_completed, make_fake_pool) -> tuple[FileTransferManager, dict[str, _Blob]]:
+    """返回接在空内存存储上的 FileTransferManager 及该存储，测试按需预置内容。"""
+    store: dict[str, _Blob] = {}
+    pool = make_fake_pool(_FakeConn(store, fake_completed))
+    return FileTransferManager(settings=_SETTINGS, pool=pool), store  # type: ignore[arg-type]
 
-            async def __aexit__(_self, exc_type, exc, tb):
-                return False
 
-        return _CM()
+# 默认使用真实的块大小；逐字节级别的小块仅作为边界覆盖，标记为 slow
+_CHUNK_CASES = [
+    pytest.param(65536, b"hello world" * 100, id="64KiB"),
+    pytest.param(4, b"hello world", id="tiny", marks=pytest.mark.slow),
+]
 
 
-@pytest.mark.asyncio
-async def test_upload_file_and_md5(tmp_path: Path) -> None:
-    store: dict[str, bytearray] = {}
-    conn = _FakeConn(store)
-    pool = _FakePool(conn)
-    mgr = FileTransferManager(settings=SSHMCPSettings(command_timeout_seconds=30), pool=pool)  # type: ignore[arg-type]
+@pytest.mark.parametrize(("chunk", "payload"), _CHUNK_CASES)
+async def test_upload_file_and_md5(
+    tmp_path: Path,
+    ftm_with_store: tuple[FileTransferManager, dict[str, _Blob]],
+    creds: SSHCredentials,
+    chunk: int,
+    payload: bytes,
+) -> None:
+    mgr, store = ftm_with_store
 
     local = tmp_path / "a.bin"
-    local.write_bytes(b"hello world")
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
+    local.write_bytes(payload)
 
     res = await mgr.upload_file(
         host="1.2.3.4",
@@ -129,21 +147,24 @@ async def test_upload_file_and_md5(tmp_path: Path) -> None:
         local_path=str(local),
         remote_path="/tmp/a.bin",
         verify_md5=True,
-        chunk_size=4,
+        chunk_size=chunk,
     )
-    assert bytes(store["/tmp/a.bin"]) == b"hello world"
+    assert store["/tmp/a.bin"].getvalue() == payload
     assert res.md5_match is True
 
 
-@pytest.mark.asyncio
-async def test_download_file(tmp_path: Path) -> None:
-    store: dict[str, bytearray] = {"/tmp/a.bin": bytearray(b"hello")}
-    conn = _FakeConn(store)
-    pool = _FakePool(conn)
-    mgr = FileTransferManager(settings=SSHMCPSettings(command_timeout_seconds=30), pool=pool)  # type: ignore[arg-type]
+@pytest.mark.parametrize(("chunk", "payload"), _CHUNK_CASES)
+async def test_download_file(
+    tmp_path: Path,
+    ftm_with_store: tuple[FileTransferManager, dict[str, _Blob]],
+    creds: SSHCredentials,
+    chunk: int,
+    payload: bytes,
+) -> None:
+    mgr, store = ftm_with_store
+    store["/tmp/a.bin"] = _Blob(payload)
 
     local = tmp_path / "b.bin"
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
 
     res = await mgr.download_file(
         host="1.2.3.4",
@@ -152,19 +173,17 @@ async def test_download_file(tmp_path: Path) -> None:
         remote_path="/tmp/a.bin",
         local_path=str(local),
         verify_md5=True,
-        chunk_size=2,
+        chunk_size=chunk,
     )
-    assert local.read_bytes() == b"hello"
+    assert local.read_bytes() == payload
     assert res.md5_match is True
 
 
-@pytest.mark.asyncio
-async def test_get_file_info() -> None:
-    store: dict[str, bytearray] = {"/tmp/a.bin": bytearray(b"hello")}
-    conn = _FakeConn(store)
-    pool = _FakePool(conn)
-    mgr = FileTransferManager(settings=SSHMCPSettings(command_timeout_seconds=30), pool=pool)  # type: ignore[arg-type]
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
+async def test_get_file_info(
+    ftm_with_store: tuple[FileTransferManager, dict[str, _Blob]], creds: SSHCredentials
+) -> None:
+    mgr, store = ftm_with_store
+    store["/tmp/a.bin"] = _Blob(b"hello")
 
     info = await mgr.get_file_info(host="1.2.3.4", port=22, credentials=creds, path="/tmp/a.bin")
     assert info["size"] == 5
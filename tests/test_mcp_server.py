@@ -1,30 +1,66 @@
-import pytest
-
-from linux_ssh_mcp.mcp_server import create_mcp_server
-from linux_ssh_mcp.settings import SSHMCPSettings
-
-
-@pytest.mark.asyncio
-async def test_mcp_server_registers_expected_tools() -> None:
-    server = create_mcp_server(settings=SSHMCPSettings())
-    tools = await server.list_tools()
-    names = sorted(t.name for t in tools)
-
-    assert names == sorted(
-        [
-            "auth_store_credentials",
-            "dir_interactive",
-            "dir_list",
-            "file_download",
-            "file_info",
-            "file_upload",
-            "ssh_clear_cache",
-            "ssh_execute",
-            "ssh_execute_batch",
-            "ssh_execute_script",
-            "ssh_health_check",
-            "ssh_search_content",
-            "ssh_session_info",
-            "ssh_system_info",
-        ]
-    )
+import gc
+import weakref
+
+# 已按字母序排列
+_EXPECTED_TOOLS = (
+    "auth_store_credentials",
+    "dir_interactive",
+    "dir_list",
+    "file_download",
+    "file_info",
+    "file_upload",
+    "ssh_clear_cache",
+    "ssh_execute",
+    "ssh_execute_batch",
+    "ssh_execute_script",
+    "ssh_health_check",
+    "ssh_search_content",
+    "ssh_session_info",
+    "ssh_system_info",
+)
+
+
+async def test_mcp_server_registers_expected_tools(mcp_server) -> None:
+    tools = await mcp_server.list_tools()
+
+    assert tuple(sorted(t.name for t in tools)) == _EXPECTED_TOOLS
+
+
+async def test_mcp_server_reuses_tool_schemas_across_instances(monkeypatch) -> None:
+    # 与 conftest 的 mcp_server 夹具一致延迟导入，收集阶段不加载 mcp
+    from linux_ssh_mcp import mcp_server as server_module
+    from linux_ssh_mcp.mcp_server import create_mcp_server
+    from linux_ssh_mcp.settings import SSHMCPSettings
+
+    # 清空模板缓存，确保由 first 构建模板，才能验证模板不会留住 first
+    monkeypatch.setattr(server_module, "_TOOL_TEMPLATES", {})
+    first = create_mcp_server(settings=SSHMCPSettings())
+    templates = dict(server_module._TOOL_TEMPLATES)
+    second = create_mcp_server(settings=SSHMCPSettings())
+    assert server_module._TOOL_TEMPLATES == templates
+
+    first_tools = {t.name: t for t in await first.list_tools()}
+    first_fns = []
+    second_tools = {t.name: t for t in await second.list_tools()}
+    assert first_tools.keys() == second_tools.keys()
+    for name, t in first_tools.items():
+        assert second_tools[name].inputSchema == t.inputSchema
+        assert second_tools[name].description == t.description
+        first_tool = first._tool_manager.get_tool(name)
+        second_tool = second._tool_manager.get_tool(name)
+        assert first_tool is not None and second_tool is not None
+        assert first_tool.fn is not second_tool.fn
+        first_fns.append(weakref.ref(first_tool.fn))
+        # 参数模型直接取自模板，而不是重新构建
+        template = server_module._TOOL_TEMPLATES[second_tool.fn.__code__]
+        assert second_tool.fn_metadata is template.fn_metadata
+
+    result = await second.call_tool("ssh_session_info", {})
+    assert result is not None
+
+    # 模板不持有闭包，丢弃首个服务器后其工具闭包（连同管理器对象）应可被回收
+    first_ref = weakref.ref(first)
+    del first, first_tool
+    gc.collect()
+    assert first_ref() is None
+    assert all(ref() is None for ref in first_fns)
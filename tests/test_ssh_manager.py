@@ -1,62 +1,45 @@
+import shlex
+from typing import Any
+
 import pytest
 
 from linux_ssh_mcp.auth_manager import SSHCredentials
 from linux_ssh_mcp.cache_manager import CacheManager
-from linux_ssh_mcp.connection_pool import ConnectionPool
+from linux_ssh_mcp.exceptions import CommandBlockedError
 from linux_ssh_mcp.settings import SSHMCPSettings
-from linux_ssh_mcp.ssh_manager import SSHManager
+from linux_ssh_mcp.ssh_manager import SSHManager, _fast_quote
 from linux_ssh_mcp.token_optimizer import TokenOptimizer
 
-
-class FakeCompleted:
-    def __init__(self, *, stdout: str, stderr: str, exit_status: int) -> None:
-        self.stdout = stdout
-        self.stderr = stderr
-        self.exit_status = exit_status
-
-
-class FakeConn:
-    def __init__(self) -> None:
-        self.calls: list[tuple[str, str | None]] = []
-
-    async def run(self, command: str, *, input=None, **_kwargs):
-        self.calls.append((command, input))
-        if "echo" in command:
-            return FakeCompleted(stdout="ok\nerror: bad\n", stderr="", exit_status=0)
-        if "hostname" in command:
-            return FakeCompleted(stdout="host1\n", stderr="", exit_status=0)
-        return FakeCompleted(stdout="out\n", stderr="", exit_status=0)
+_RESPONSES = {"echo": "ok\nerror: bad\n", "hostname": "host1\n"}
+_CACHE_SETTINGS = SSHMCPSettings(cache_maxsize=128)
+_SETTINGS = SSHMCPSettings(command_timeout_seconds=30, static_ttl_max_seconds=3600)
+# TokenOptimizer 无实例状态，可在模块内共享
+_TOKEN_OPTIMIZER = TokenOptimizer()
 
 
-class FakePool(ConnectionPool):
-    def __init__(self, *, settings: SSHMCPSettings, conn: FakeConn) -> None:
-        self._settings = settings
-        self._conn = conn
+@pytest.fixture
+def cache() -> CacheManager:
+    """每个测试独立的缓存实例，配置对象在模块内共享。"""
+    return CacheManager(settings=_CACHE_SETTINGS)
 
-    def acquire_connection(self, *, host: str, port: int, credentials: SSHCredentials):
-        class _CM:
-            async def __aenter__(_self):
-                return self._conn
 
-            async def __aexit__(_self, exc_type, exc, tb):
-                return False
-
-        return _CM()
-
-
-@pytest.mark.asyncio
-async def test_execute_command_caches_output() -> None:
-    settings = SSHMCPSettings(command_timeout_seconds=30)
-    conn = FakeConn()
-    pool = FakePool(settings=settings, conn=conn)
-    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=128))
+@pytest.fixture
+def ssh_stack(make_fake_conn, make_fake_pool, cache: CacheManager) -> tuple[SSHManager, Any]:
+    """组装好假连接池与独立缓存的 SSHManager，返回 (mgr, conn)。"""
+    conn = make_fake_conn(_RESPONSES, default="out\n")
     mgr = SSHManager(
-        settings=settings,
-        pool=pool,
+        settings=_SETTINGS,
+        pool=make_fake_pool(conn),  # type: ignore[arg-type]
         cache=cache,
-        token_optimizer=TokenOptimizer(),
+        token_optimizer=_TOKEN_OPTIMIZER,
     )
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
+    return mgr, conn
+
+
+async def test_execute_command_caches_output(
+    ssh_stack: tuple[SSHManager, Any], creds: SSHCredentials
+) -> None:
+    mgr, conn = ssh_stack
 
     r1 = await mgr.execute_command(host="1.2.3.4", port=22, credentials=creds, command="echo hi")
     r2 = await mgr.execute_command(host="1.2.3.4", port=22, credentials=creds, command="echo hi")
@@ -65,19 +48,10 @@ async def test_execute_command_caches_output() -> None:
     assert len(conn.calls) == 1
 
 
-@pytest.mark.asyncio
-async def test_execute_command_filter_mode() -> None:
-    settings = SSHMCPSettings(command_timeout_seconds=30)
-    conn = FakeConn()
-    pool = FakePool(settings=settings, conn=conn)
-    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=128))
-    mgr = SSHManager(
-        settings=settings,
-        pool=pool,
-        cache=cache,
-        token_optimizer=TokenOptimizer(),
-    )
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
+async def test_execute_command_filter_mode(
+    ssh_stack: tuple[SSHManager, Any], creds: SSHCredentials
+) -> None:
+    mgr, _ = ssh_stack
 
     r = await mgr.execute_command(
         host="1.2.3.4",
@@ -91,22 +65,72 @@ async def test_execute_command_filter_mode() -> None:
     assert r.stdout.strip() == "error: bad"
 
 
-@pytest.mark.asyncio
-async def test_get_system_info_caches() -> None:
-    settings = SSHMCPSettings(command_timeout_seconds=30, static_ttl_max_seconds=3600)
-    conn = FakeConn()
-    pool = FakePool(settings=settings, conn=conn)
-    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=128))
-    mgr = SSHManager(
-        settings=settings,
-        pool=pool,
-        cache=cache,
-        token_optimizer=TokenOptimizer(),
-    )
-    creds = SSHCredentials(host="1.2.3.4", username="root", password=None, private_key_path=None)
+async def test_get_system_info_caches(
+    ssh_stack: tuple[SSHManager, Any], creds: SSHCredentials
+) -> None:
+    mgr, _ = ssh_stack
 
     a = await mgr.get_system_info(host="1.2.3.4", port=22, credentials=creds)
     b = await mgr.get_system_info(host="1.2.3.4", port=22, credentials=creds)
     assert a["hostname"]["stdout"] == "host1"
     assert a == b
 
+
+async def test_get_system_info_force_refresh_is_cached_when_cache_full(
+    make_fake_conn, make_fake_pool, creds: SSHCredentials
+) -> None:
+    cache = CacheManager(settings=SSHMCPSettings(cache_maxsize=1))
+    await cache.set("hot", 1)
+    for _ in range(3):
+        assert await cache.get("hot") == 1
+    mgr = SSHManager(
+        settings=_SETTINGS,
+        pool=make_fake_pool(make_fake_conn(_RESPONSES)),  # type: ignore[arg-type]
+        cache=cache,
+        token_optimizer=_TOKEN_OPTIMIZER,
+    )
+
+    await mgr.get_system_info(host="1.2.3.4", port=22, credentials=creds, force_refresh=True)
+
+    cached = await cache.get(("system_info", "1.2.3.4", 22, creds.username))
+    assert cached is not None
+    assert cached["hostname"]["stdout"] == "host1"
+
+
+@pytest.mark.parametrize("value", ["", "/var/log", "a b", "it's", "$(id)", "中文", "x;y"])
+def test_fast_quote_matches_shlex_quote(value: str) -> None:
+    assert _fast_quote(value) == shlex.quote(value)
+
+
+async def test_execute_script_still_validates_custom_shell(
+    ssh_stack: tuple[SSHManager, Any], creds: SSHCredentials
+) -> None:
+    mgr, conn = ssh_stack
+
+    r = await mgr.execute_script(host="1.2.3.4", port=22, credentials=creds, script="ls")
+    assert r.command == "/bin/bash -s"
+
+    with pytest.raises(CommandBlockedError):
+        await mgr.execute_script(
+            host="1.2.3.4", port=22, credentials=creds, script="ls", shell="reboot"
+        )
+    assert len(conn.calls) == 1
+
+
+async def test_execute_batch_iter_yields_results_in_order(
+    ssh_stack: tuple[SSHManager, Any], creds: SSHCredentials
+) -> None:
+    mgr, conn = ssh_stack
+
+    seen: list[str] = []
+    async for r in mgr.execute_batch_iter(
+        host="1.2.3.4", port=22, credentials=creds, commands=["hostname", " ", "uptime"]
+    ):
+        seen.append(r.command)
+        assert len(conn.calls) == len(seen)
+    assert seen == ["hostname", "uptime"]
+
+    batch = await mgr.execute_batch(
+        host="1.2.3.4", port=22, credentials=creds, commands=["hostname", "uptime"]
+    )
+    assert [r.stdout for r in batch] == ["host1\n", "out\n"]
@@ -1,14 +1,48 @@
 from __future__ import annotations
 
+import os
 import sys
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, suppress
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+import anyio
 import pytest
 from mcp.client.session import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.shared.memory import create_connected_server_and_client_session
 
+from linux_ssh_mcp.mcp_server import _BufferedStdinLines, _BufferedStdoutWriter
 
-@pytest.mark.asyncio
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+
+@pytest.fixture
+def inproc_server(
+    mcp_server: FastMCP,
+) -> Callable[[], AbstractAsyncContextManager[ClientSession]]:
+    """返回经内存流连接进程内服务器的客户端会话工厂，无需启动子进程。
+
+    以工厂形式提供而非异步生成器夹具：会话内部的 anyio 任务组必须在
+    同一个任务中进入和退出，只能由测试函数自己 async with。
+    """
+    return lambda: create_connected_server_and_client_session(mcp_server)
+
+
+async def test_inproc_server_initialize_and_list_tools(
+    inproc_server: Callable[[], AbstractAsyncContextManager[ClientSession]],
+) -> None:
+    async with inproc_server() as session:
+        tools = await session.list_tools()
+    names = sorted(t.name for t in tools.tools)
+    assert "ssh_execute" in names
+    assert "dir_list" in names
+
+
+# 真实子进程 + stdio 管道的端到端覆盖，启动解释器与导入依赖较慢
+@pytest.mark.slow
 async def test_stdio_server_initialize_and_list_tools() -> None:
     project_root = Path(__file__).resolve().parents[1]
     params = StdioServerParameters(
@@ -24,3 +58,72 @@ async def test_stdio_server_initialize_and_list_tools() -> None:
             names = sorted(t.name for t in tools.tools)
             assert "ssh_execute" in names
             assert "dir_list" in names
+
+
+async def test_buffered_stdin_lines_splits_frames_across_chunks() -> None:
+    read_fd, write_fd = os.pipe()
+    try:
+        os.write(write_fd, b'{"a":1}\n\n{"b":"\xe4\xbd\xa0')
+        os.write(write_fd, b'\xe5\xa5\xbd"}\n{"c":3}')
+        os.close(write_fd)
+        lines = [line async for line in _BufferedStdinLines(read_fd, read_size=8)]
+    finally:
+        os.close(read_fd)
+
+    assert lines == ['{"a":1}', '{"b":"你好"}', '{"c":3}']
+
+
+async def test_buffered_stdout_writer_writes_pending_frames_on_flush() -> None:
+    read_fd, write_fd = os.pipe()
+    try:
+        writer = _BufferedStdoutWriter(write_fd)
+        await writer.write('{"a":1}\n')
+        await writer.write('{"b":"你好"}\n')
+        await writer.flush()
+        await writer.flush()
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as f:
+            data = f.read()
+    finally:
+        for fd in (read_fd, write_fd):
+            with suppress(OSError):
+                os.close(fd)
+
+    assert data == '{"a":1}\n{"b":"你好"}\n'.encode()
+
+
+async def test_buffered_stdout_writer_waits_when_nonblocking_pipe_is_full() -> None:
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+    payload = "x" * (1 << 20) + "\n"
+    try:
+        writer = _BufferedStdoutWriter(write_fd)
+        await writer.write(payload)
+        with os.fdopen(read_fd, "rb", closefd=False) as f:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(writer.flush)
+                data = await anyio.to_thread.run_sync(f.read, len(payload))
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+    assert data == payload.encode()
+
+
+async def test_buffered_stdin_lines_waits_when_nonblocking_pipe_is_empty() -> None:
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+
+    async def write_later() -> None:
+        await anyio.sleep(0.2)
+        os.write(write_fd, b'{"a":1}\n')
+        os.close(write_fd)
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(write_later)
+            lines = [line async for line in _BufferedStdinLines(read_fd)]
+    finally:
+        os.close(read_fd)
+
+    assert lines == ['{"a":1}']
@@ -1,4 +1,16 @@
-from linux_ssh_mcp.token_optimizer import TokenOptimizer
+import re
+import time
+
+import pytest
+
+from linux_ssh_mcp import token_optimizer
+from linux_ssh_mcp.token_optimizer import (
+    TokenOptimizer,
+    _compile_guarded,
+    _count_tokens_cached,
+    _strip_redundant_wildcards,
+    _truncate_cached,
+)
 
 
 def test_filter_by_pattern_keeps_matching_lines() -> None:
@@ -13,6 +25,25 @@ def test_estimate_tokens_counts_cjk_and_others() -> None:
     assert optimizer.estimate_tokens("abcd") >= 1
 
 
+def test_estimate_tokens_reuses_cached_count_for_repeated_text() -> None:
+    optimizer = TokenOptimizer()
+    text = "重复的输出 repeated output"
+    first = optimizer.estimate_tokens(text)
+    hits = _count_tokens_cached.cache_info().hits
+    assert optimizer.estimate_tokens(text) == first
+    assert _count_tokens_cached.cache_info().hits == hits + 1
+
+
+def test_truncate_by_tokens_reuses_cached_result_for_repeated_call() -> None:
+    optimizer = TokenOptimizer()
+    text = "重复的输出 " * 50
+    first = optimizer.truncate_by_tokens(text, max_tokens=20)
+    hits = _truncate_cached.cache_info().hits
+    assert optimizer.truncate_by_tokens(text, max_tokens=20) == first
+    assert _truncate_cached.cache_info().hits == hits + 1
+    assert optimizer.estimate_tokens(first) <= 20
+
+
 def test_truncate_by_tokens_reduces_text() -> None:
     optimizer = TokenOptimizer()
     text = "a" * 1000
@@ -20,3 +51,100 @@ def test_truncate_by_tokens_reduces_text() -> None:
     assert truncated != text
     assert optimizer.estimate_tokens(truncated) <= 10
 
+
+def test_filter_by_pattern_shares_compiled_cache_across_instances() -> None:
+    TokenOptimizer().filter_by_pattern("error: x", pattern=r"^shared:\s")
+    hits = _compile_guarded.cache_info().hits
+    assert TokenOptimizer().filter_by_pattern("shared: y\nno", pattern=r"^shared:\s") == "shared: y"
+    assert _compile_guarded.cache_info().hits > hits
+
+
+@pytest.mark.parametrize(
+    ("text", "pattern"),
+    [
+        ("ok\nerror: a\n\nerror: b\n", r"^error:"),
+        ("error:\nnext line", r"error:\s*"),
+        ("a\r\nb\r\n", r"^b$"),
+        ("x\n\ny", r"^$"),
+        ("ab\ncd", r"(?=c)"),
+        ("a.b\nab\n", r"^.*\..*$"),
+        ("error: a\nx error:\nerror:", r"^error:"),
+        ("\nerror: a\n\nerror:\n", r"^error:"),
+        ("error: a\r\nx error:\r\n", r"^error:"),
+        ("ERROR disk full   \n\nerror: foo\n", r"full\s*+$"),
+        ("a  \nb\n\nc \n", r"(?>\s*)$"),
+        ("x{2}y \n\nxx\n", r"x{2}+\s?+$"),
+        ("ab\n\ncd\n", r"\B"),
+        ("foo x\nbar\nbaz foo baz\nnone\nqux", r"foo|baz|qux"),
+        ("错误 a\n正常\n警告 错误\n", r"错误|警告"),
+    ],
+)
+def test_filter_by_pattern_matches_line_by_line_semantics(text: str, pattern: str) -> None:
+    compiled = re.compile(pattern)
+    expected = "\n".join(line for line in text.splitlines() if compiled.search(line))
+    assert TokenOptimizer().filter_by_pattern(text, pattern=pattern) == expected
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        (r".*error.*", r"error"),
+        (r"^.*error.*$", r"error"),
+        (r"(?i).*error", r"(?i)error"),
+        (r"\.*x", r"\.*x"),
+        (r"x\.*", r"x\.*"),
+        (r".*+x", r".*+x"),
+    ],
+)
+def test_strip_redundant_wildcards(pattern: str, expected: str) -> None:
+    assert _strip_redundant_wildcards(pattern) == expected
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        (r"fatal|warn|error", r"error|warn|fatal"),
+        (r"(?i)FATAL|ERROR", r"(?i)ERROR|FATAL"),
+        (r"warn\||[|x]|(fatal|error)", r"[|x]|(fatal|error)|warn\|"),
+        (r"(f)\1|error", r"(f)\1|error"),
+    ],
+)
+def test_optimize_pattern_orders_alternatives_by_hits(pattern: str, expected: str) -> None:
+    sample = "error: a\nerror: b\nwarn| c\nx\nnothing\n"
+    assert TokenOptimizer().optimize_pattern(pattern, sample) == expected
+
+
+@pytest.mark.parametrize("pattern", [r"(?i)fail(ed|ure)\s+\w+", r"\d+%$", r"错误"])
+def test_filter_by_pattern_matches_line_semantics_on_large_sparse_text(pattern: str) -> None:
+    lines = [f"INFO service {i} started ok" for i in range(4000)]
+    lines[10] = "ssh: Failure  auth 错误"
+    lines[3000] = "disk usage 97%"
+    text = "\n".join(lines) + "\n"
+    compiled = re.compile(pattern)
+    expected = "\n".join(line for line in lines if compiled.search(line))
+    assert TokenOptimizer().filter_by_pattern(text, pattern=pattern) == expected
+
+
+def test_filter_by_pattern_rejects_catastrophic_backtracking(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("regex")
+    monkeypatch.setattr(token_optimizer, "_FILTER_TIMEOUT", 0.2)
+    # 每行单独匹配都远小于预算，累计起来才超出：超时必须作用于整次过滤
+    text = "\n".join(["a" * 22 + "b"] * 200)
+    started = time.monotonic()
+    with pytest.raises(ValueError, match="匹配超时"):
+        TokenOptimizer().filter_by_pattern(text, pattern=r"(a|aa)+$")
+    assert time.monotonic() - started < 1.0
+
+
+def test_filter_by_pattern_budget_scales_with_input_size(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # 去掉固定基数后只剩按大小的配额：正常模式过滤大输出不应被误判为回溯
+    monkeypatch.setattr(token_optimizer, "_FILTER_TIMEOUT", 0.0)
+    lines = [f"INFO service {i} started ok" for i in range(40000)]
+    lines[123] = "ERROR: disk failure"
+    text = "\r\n".join(lines)
+    result = TokenOptimizer().filter_by_pattern(text, pattern=r"(?i)error|fail")
+    assert result == "ERROR: disk failure"